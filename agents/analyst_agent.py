@@ -1,17 +1,23 @@
 import os
-from typing import Dict, Any
+import logging
+from typing import Dict, Any, List
 
-from openai import OpenAI
 from swarm import Swarm, Agent 
 from swarm.types import Result # Import Result from swarm.types
+from utils.llm import chat_completion
+from utils.progress import send_update
+from utils.evidence import EVIDENCE, build_prompt, get_evidence_artifact
+from utils.depth import pipeline_depth
 import websockets
-import asyncio
 
 # Import necessary for handoff
 from agents.argumentation_mining_agent import argumentation_handoff
+from utils.log import fields
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
+
+# Token budget for the analysis prompt
+ANALYSIS_PROMPT_TOKENS = int(os.getenv("ANALYSIS_PROMPT_TOKENS", 12000))
 
 # --- Analyst Agent ---
 def analyze_research(
@@ -22,25 +28,17 @@ def analyze_research(
     key insights, supporting/refuting evidence, potential biases, and
     inconsistencies.
     """
-    print("Analyzing Research Data...")
-    # Format the research data for a clear presentation to the LLM
-    formatted_research = ""
-    for question, results in research_data.items():
-        formatted_research += f"## {question}\n"
-        for i, result in enumerate(results):
-            source = result.get("source", "Unknown Source")
-            title = result.get("title", "No Title")
-            url = result.get("url", "No URL")
-            snippet = result.get("snippet", "")
-            formatted_research += (
-                f"**Result {i+1} ({source}):**\n"
-                f"   - **Title:** {title}\n"
-                f"   - **URL:** {url}\n"
-                f"   - **Snippet:** {snippet}\n\n"
-            )
+    logger.info("Analyzing research data", extra=fields(questions=len(research_data)))
+    # Fit the shared evidence artifact into this stage's token budget
+    user_prompt = build_prompt(
+        [("Claim", rephrased_claim), ("Chain of Thought", chain_of_thought), ("Research Data", EVIDENCE)],
+        get_evidence_artifact(research_data),
+        ANALYSIS_PROMPT_TOKENS,
+    )
 
-    response = openai_client.chat.completions.create(
+    analysis = chat_completion(
         model="gpt-4o",
+        stage="analysis",
         messages=[
             {
                 "role": "system",
@@ -52,29 +50,44 @@ def analyze_research(
             },
             {
                 "role": "user",
-                "content": f"Claim: {rephrased_claim}\nChain of Thought: {chain_of_thought}\nResearch Data: {formatted_research}",
+                "content": user_prompt,
             },
         ],
         temperature=0.3,
     )
-    analysis = response.choices[0].message.content.strip()
-    print("Analysis:", analysis)
+    logger.debug("Analysis", extra=fields(sample=True, analysis=analysis))
     return analysis
 
-def analyst_handoff(rephrased_claim: str, chain_of_thought: str, research_data: Dict[str, Any]) -> Result:
+def analyst_handoff(
+    rephrased_claim: str, chain_of_thought: str, research_data: Dict[str, Any], subclaims: List[str] = None
+) -> Result:
     """Handoff function to pass the analysis to the Argumentation Mining Agent.
+    At the "quick" pipeline depth the run stops here, keeping what the
+    remaining stages need to be continued later.
     """
-    global active_websocket # Declare active_websocket as global
     analysis = analyze_research(rephrased_claim, chain_of_thought, research_data)
 
     # Send agent_update message 
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": analyst_agent.name,
         "content": f"## Analysis:\n\n{analysis}"
-    }))
+    })
+
+    analysis_context = {
+        "rephrased_claim": rephrased_claim,
+        "chain_of_thought": chain_of_thought,
+        "research_data": research_data,
+        "analysis": analysis,
+        "subclaims": subclaims or [],
+    }
+    if pipeline_depth() == "quick":
+        return Result(value="Completed the quick analysis.", context_variables=analysis_context)
 
-    return argumentation_handoff(rephrased_claim, analysis, research_data) 
+    result = argumentation_handoff(rephrased_claim, analysis, research_data, subclaims=subclaims)
+    for key, value in analysis_context.items():
+        result.context_variables.setdefault(key, value)
+    return result
 
 # Define the agent at the bottom of the file
 analyst_agent = Agent(
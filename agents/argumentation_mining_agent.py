@@ -1,15 +1,21 @@
 import os
+import logging
 from typing import Dict, Any, List
-import asyncio
-from openai import OpenAI
 from swarm import Swarm, Agent 
 from swarm.types import Result # Import Result from swarm.types
+from utils.llm import chat_completion
+from utils.progress import send_update
+from utils.evidence import EVIDENCE, build_prompt, get_evidence_artifact
+from utils.depth import pipeline_depth
 import websockets
 from agents.drafter_agent import drafter_agent, drafting_handoff
 from agents.objectivity_agent import objectivity_agent, objectivity_handoff # Import for the next handoff
+from utils.log import fields
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
+
+# Token budget for the argumentation mining prompt
+ARGUMENTATION_PROMPT_TOKENS = int(os.getenv("ARGUMENTATION_PROMPT_TOKENS", 12000))
 
 # --- Argumentation Mining Agent ---
 def mine_arguments(
@@ -19,25 +25,17 @@ def mine_arguments(
     Identifies premises and conclusions, evaluates evidence quality, and
     detects potential biases and logical fallacies.
     """
-    print("Mining Arguments")
-    # Format the research data for a clear presentation to the LLM
-    formatted_research = ""
-    for question, results in research_data.items():
-        formatted_research += f"## {question}\n"
-        for i, result in enumerate(results):
-            source = result.get("source", "Unknown Source")
-            title = result.get("title", "No Title")
-            url = result.get("url", "No URL")
-            snippet = result.get("snippet", "")
-            formatted_research += (
-                f"**Result {i+1} ({source}):**\n"
-                f"   - **Title:** {title}\n"
-                f"   - **URL:** {url}\n"
-                f"   - **Snippet:** {snippet}\n\n"
-            )
+    logger.info("Mining arguments")
+    # Fit the shared evidence artifact into this stage's token budget
+    user_prompt = build_prompt(
+        [("Claim", rephrased_claim), ("Analysis", analysis), ("Research Data", EVIDENCE)],
+        get_evidence_artifact(research_data),
+        ARGUMENTATION_PROMPT_TOKENS,
+    )
 
-    response = openai_client.chat.completions.create(
+    argumentation_analysis = chat_completion(
         model="gpt-4o",
+        stage="argumentation",
         messages=[
             {
                 "role": "system",
@@ -51,31 +49,46 @@ def mine_arguments(
             },
             {
                 "role": "user",
-                "content": f"Claim: {rephrased_claim}\nAnalysis: {analysis}\nResearch Data: {formatted_research}",
+                "content": user_prompt,
             },
         ],
         temperature=0.3,
     )
-    argumentation_analysis = response.choices[0].message.content.strip()
-    print("Argumentation Analysis:", argumentation_analysis)
+    logger.debug("Argumentation analysis", extra=fields(sample=True, argumentation_analysis=argumentation_analysis))
     return argumentation_analysis
 
-def argumentation_handoff(rephrased_claim: str, analysis: str, research_data: Dict[str, Any]) -> Result:
+def argumentation_handoff(
+    rephrased_claim: str,
+    analysis: str,
+    research_data: Dict[str, Any],
+    argumentation_analysis: str = None,
+    subclaims: List[str] = None,
+) -> Result:
     """Handoff function to pass the argument analysis to the Drafter Agent.
+    At the "standard" pipeline depth the run stops after the draft report.
+    Arguments already mined (per sub-claim in map-reduce mode) are passed
+    in `argumentation_analysis` and not mined again.
     """
-    global active_websocket # Declare active_websocket as global
-    argumentation_analysis = mine_arguments(rephrased_claim, analysis, research_data)
+    if argumentation_analysis is None:
+        argumentation_analysis = mine_arguments(rephrased_claim, analysis, research_data)
     intermediate_result = drafting_handoff(argumentation_analysis)
     draft_report = intermediate_result.context_variables.get("draft_report")
 
     # Send agent_update message 
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": argumentation_mining_agent.name,
         "content": f"## Argumentation Analysis:\n\n{argumentation_analysis}"
-    }))
+    })
+
+    draft_context = {"argumentation_analysis": argumentation_analysis, "draft_report": draft_report}
+    if pipeline_depth() == "standard":
+        return Result(value="Completed the draft report.", context_variables=draft_context)
 
-    return objectivity_handoff(draft_report)
+    result = objectivity_handoff(draft_report, rephrased_claim, analysis, research_data, subclaims)
+    for key, value in draft_context.items():
+        result.context_variables.setdefault(key, value)
+    return result
 
 # Define the agent at the bottom of the file
 argumentation_mining_agent = Agent(
@@ -1,50 +1,50 @@
-import os
+import logging
 from typing import List
-import asyncio
-from openai import OpenAI
 from swarm import Swarm, Agent 
 from swarm.types import Result # Import Result from swarm.types
+from utils.progress import send_update
+from utils.structured import structured_list
 import websockets
 # Import handoff function (no agent import)
 from agents.question_generation_agent import question_generation_handoff
+from utils.log import fields
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
 
 # --- Claim Decomposition Agent ---
 def decompose_claim(chain_of_thought: str) -> List[str]:
     """Decomposes the claim into smaller, verifiable sub-claims 
     that are specific, measurable, achievable, relevant, and time-bound (SMART). 
     """
-    print("Decomposing Claim...")
-    response = openai_client.chat.completions.create(
+    logger.info("Decomposing claim")
+    subclaims = structured_list(
         model="gpt-4o",
+        stage="decomposition",
+        key="subclaims",
+        max_items=5,
         messages=[
-            {"role": "system", "content": "Decompose this claim into 5 SMART sub-claims that can be researched independently, considering this chain of thought: "},
+            {"role": "system", "content": "Decompose this claim into 5 SMART sub-claims that can be researched independently. Return them as a JSON object with a 'subclaims' list, one sub-claim per item, considering this chain of thought: "},
             {"role": "user", "content": f"Chain of Thought: {chain_of_thought}"}
         ],
         temperature=0.5
     )
-    subclaims_text = response.choices[0].message.content.strip()
-    subclaims = [line.strip() for line in subclaims_text.split("\n") if line.strip()]
-    print("Subclaims:", subclaims)
+    logger.info("Sub-claims generated", extra=fields(count=len(subclaims), subclaims=subclaims))
     return subclaims
 
-def decomposition_handoff(chain_of_thought: str) -> Result:
+def decomposition_handoff(chain_of_thought: str, rephrased_claim: str = "") -> Result:
     """Handoff function to pass the sub-claims to the 
     Question Generation Agent.
     """
-    global active_websocket # Declare active_websocket as global 
     subclaims = decompose_claim(chain_of_thought)
 
 
     # Send agent_update message 
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": claim_decomposition_agent.name,
         "content": f"## Subclaims:\n\n{subclaims}"
-    }))
-    return question_generation_handoff(subclaims, chain_of_thought)
+    })
+    return question_generation_handoff(subclaims, chain_of_thought, rephrased_claim)
 
 claim_decomposition_agent = Agent(
     name='Claim Decomposition Agent',
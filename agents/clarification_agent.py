@@ -1,68 +1,76 @@
-import os
+import logging
 from typing import List
-import asyncio
-from openai import OpenAI
 from swarm import Swarm, Agent 
 from swarm.types import Result # Import Result from swarm.types
+from utils.llm import chat_completion
+from utils.progress import send_update
+from utils.structured import structured_list
 
 # Imports for handoff functions (no agent imports)
 from agents.cognitive_reasoning_agent import cognitive_reasoning_handoff
-from agents.claim_decomposition_agent import decomposition_handoff
+from agents.research_agent import PREFETCH_PERSPECTIVES, prefetch_evidence
+from utils.log import fields
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
 
 # --- Clarification Agent ---
 def rephrase_claim(claim: str) -> str:
     """Rephrases the user's claim for clarity and neutrality, 
     removing emotional charge and leading language. 
     """
-    print("Rephrasing claim:", claim)
-    response = openai_client.chat.completions.create(
+    logger.info("Rephrasing claim", extra=fields(claim=claim))
+    rephrased_claim = chat_completion(
         model="gpt-4o",
+        stage="rephrase",
+        fallback=claim,
         messages=[
             {"role": "system", "content": "Rephrase this claim clearly and neutrally, focusing on the core issue: "},
             {"role": "user", "content": claim}
         ],
         temperature=0.3
     )
-    rephrased_claim = response.choices[0].message.content.strip()
-    print("Rephrased Claim:", rephrased_claim)
+    logger.info("Claim rephrased", extra=fields(rephrased_claim=rephrased_claim))
     return rephrased_claim
 
 def generate_perspectives(claim: str) -> List[str]:
     """Generates multiple perspectives on the claim 
     to encourage a balanced analysis.
     """
-    print("Generating perspectives for claim:", claim)
-    response = openai_client.chat.completions.create(
+    logger.info("Generating perspectives")
+    perspectives = structured_list(
         model="gpt-4o",
+        stage="perspectives",
+        key="perspectives",
+        max_items=3,
         messages=[
-            {"role": "system", "content": "Provide 3 distinct perspectives on this claim, considering different viewpoints and potential biases: "},
+            {"role": "system", "content": "Provide 3 distinct perspectives on this claim, considering different viewpoints and potential biases. Return them as a JSON object with a 'perspectives' list, one perspective per item: "},
             {"role": "user", "content": claim}
         ],
         temperature=0.7
     )
-    perspectives_text = response.choices[0].message.content.strip()
-    perspectives = [line.strip() for line in perspectives_text.split("\n") if line.strip()]
-    print("Perspectives:", perspectives)
+    logger.info("Perspectives generated", extra=fields(count=len(perspectives), perspectives=perspectives))
     return perspectives
 
 def clarification_handoff(claim: str) -> Result:  # Add websocket parameter!
     """Handoff function to pass the rephrased claim and perspectives 
-    to the Cognitive Reasoning Agent and then to the Claim Decomposition Agent
+    to the Cognitive Reasoning Agent, which hands off to the Claim
+    Decomposition Agent and the rest of the pipeline
     """
-    global active_websocket # Declare active_websocket as global
     rephrased = rephrase_claim(claim)
+    # Warm up evidence for the claim while the remaining stages run
+    prefetch_evidence(rephrased, [rephrased])
     perspectives = generate_perspectives(rephrased)
+    prefetch_evidence(rephrased, perspectives, limit=PREFETCH_PERSPECTIVES)
     intermediate_result = cognitive_reasoning_handoff(rephrased, perspectives) # Pass websocket 
     chain_of_thought = intermediate_result.context_variables.get("chain_of_thought")
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": clarification_agent.name,
         "content": f"## Chain of Thought:\n\n{chain_of_thought}"
-    }))
-    return decomposition_handoff(chain_of_thought)  # Pass websocket
+    })
+    # The chain already ran through decomposition; running it again would
+    # repeat every later stage and find the prefetched evidence consumed
+    return intermediate_result
 
 # Define the agent at the bottom of the file
 clarification_agent = Agent(
@@ -1,15 +1,15 @@
-import os
+import logging
 from typing import List
-import asyncio
-from openai import OpenAI
 from swarm import Swarm, Agent 
 from swarm.types import Result # Import Result from swarm.types
+from utils.llm import chat_completion
+from utils.progress import send_update
 import websockets
 # Import handoff function (no agent import)
 from agents.claim_decomposition_agent import decomposition_handoff
+from utils.log import fields
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+logger = logging.getLogger(__name__)
 
 # --- Cognitive Reasoning Agent ---
 def generate_chain_of_thought(rephrased_claim: str, perspectives: List[str]) -> str:
@@ -17,10 +17,11 @@ def generate_chain_of_thought(rephrased_claim: str, perspectives: List[str]) ->
     analogical, abductive, and causal reasoning, considering 
     different perspectives and potential biases.
     """
-    print("Generating chain of thought for claim:", rephrased_claim)
+    logger.info("Generating chain of thought", extra=fields(rephrased_claim=rephrased_claim))
     perspectives_str = "\n".join([f"- {p}" for p in perspectives])
-    response = openai_client.chat.completions.create(
+    chain_of_thought = chat_completion(
         model="gpt-4o",
+        stage="chain_of_thought",
         messages=[
             {
                 "role": "system",
@@ -37,24 +38,22 @@ def generate_chain_of_thought(rephrased_claim: str, perspectives: List[str]) ->
         ],
         temperature=0.3
     )
-    chain_of_thought = response.choices[0].message.content.strip()
-    print("Chain of Thought:", chain_of_thought)
+    logger.debug("Chain of thought", extra=fields(sample=True, chain_of_thought=chain_of_thought))
     return chain_of_thought
 
 def cognitive_reasoning_handoff(rephrased_claim: str, perspectives: List[str]) -> Result:
     """Handoff function to pass the chain of thought 
     to the Claim Decomposition Agent.
     """
-    global active_websocket # Declare active_websocket as global
     chain_of_thought = generate_chain_of_thought(rephrased_claim, perspectives)
 
     # Send agent_update message using await
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": cognitive_reasoning_agent.name,
         "content": f"## Chain of Thought:\n\n{chain_of_thought}"
-    }))
-    return decomposition_handoff(chain_of_thought)
+    })
+    return decomposition_handoff(chain_of_thought, rephrased_claim)
 
 cognitive_reasoning_agent = Agent(
     name='Cognitive Reasoning Agent',
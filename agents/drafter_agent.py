@@ -1,15 +1,18 @@
 import os
+import logging
 from typing import Dict, Any, List
-import asyncio
-from openai import OpenAI
 from swarm import Swarm, Agent 
 from swarm.types import Result # Import Result from swarm.types
+from utils.llm import chat_completion
+from utils.progress import send_update
+from utils.evidence import EVIDENCE, build_prompt, get_evidence_artifact
 import websockets
+from utils.log import fields
 
+logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
+# Token budget for the report drafting prompt
+DRAFT_PROMPT_TOKENS = int(os.getenv("DRAFT_PROMPT_TOKENS", 16000))
 
 # --- Drafter Agent ---
 def draft_report(
@@ -26,28 +29,29 @@ def draft_report(
     Includes sections for the claim, clarification, chain of thought, research questions,
     research findings, argumentation analysis, overall analysis, and a conclusion.
     """
-    print("Drafting Report...")
-    # Format the data for a clear presentation to the LLM
-    formatted_research = ""
-    for question, results in research_data.items():
-        formatted_research += f"### {question}\n"
-        for i, result in enumerate(results):
-            source = result.get("source", "Unknown Source")
-            title = result.get("title", "No Title")
-            url = result.get("url", "No URL")
-            snippet = result.get("snippet", "")
-            formatted_research += (
-                f"**Result {i+1} ({source}):**\n"
-                f"   - **Title:** {title}\n"
-                f"   - **URL:** {url}\n"
-                f"   - **Snippet:** {snippet}\n\n"
-            )
-
+    logger.info("Drafting report")
     formatted_subclaims = "\n".join([f"- {sc}" for sc in subclaims])
     formatted_questions = "\n".join([f"- {rq}" for rq in research_questions])
 
-    response = openai_client.chat.completions.create(
+    # Fit the shared evidence artifact into this stage's token budget
+    user_prompt = build_prompt(
+        [
+            ("Original Claim", claim),
+            ("Clarified Claim", rephrased_claim),
+            ("Chain of Thought", chain_of_thought),
+            ("Sub-claims", formatted_subclaims),
+            ("Research Questions", formatted_questions),
+            ("Research Findings", EVIDENCE),
+            ("Argumentation Analysis", argumentation_analysis),
+            ("Overall Analysis", analysis),
+        ],
+        get_evidence_artifact(research_data),
+        DRAFT_PROMPT_TOKENS,
+    )
+
+    draft_report = chat_completion(
         model="gpt-4o",
+        stage="draft",
         messages=[
             {
                 "role": "system",
@@ -68,25 +72,23 @@ def draft_report(
             },
             {
                 "role": "user",
-                "content": f"Original Claim: {claim}\nClarified Claim: {rephrased_claim}\nChain of Thought: {chain_of_thought}\nSub-claims: {formatted_subclaims}\nResearch Questions: {formatted_questions}\nResearch Findings: {formatted_research}\nArgumentation Analysis: {argumentation_analysis}\nOverall Analysis: {analysis}",
+                "content": user_prompt,
             },
         ],
         temperature=0.3,
     )
-    draft_report = response.choices[0].message.content.strip()
-    print("Draft Report:", draft_report)
+    logger.debug("Draft report", extra=fields(sample=True, draft_report=draft_report))
     return draft_report
 
 def drafting_handoff(draft_report: str) -> Result:
     """Handoff function to pass the draft report to the Objectivity Agent.
     """
-    global active_websocket # Declare active_websocket as global
     # Send agent_update message 
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": drafter_agent.name,
         "content": f"## Draft Report:\n\n{draft_report}"
-    }))
+    })
     return Result(
         value="Completed drafting the report.",
         context_variables={"draft_report": draft_report},
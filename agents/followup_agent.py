@@ -1,40 +1,55 @@
-import os
+import logging
 from typing import Dict, Any
-import asyncio
 import websockets
-from openai import OpenAI
 from swarm import Agent
 from swarm.types import Result 
+from utils.llm import chat_completion
+from utils.progress import send_update
+from utils.followup_memory import format_followup_memory
+from utils.retrieval import FOLLOWUP_TOP_K, BM25Index, build_session_chunks, get_session_index
 from agents.user_feedback_explanation_agent import feedback_agent
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+from utils.log import fields
+
+logger = logging.getLogger(__name__)
 
 # --- Follow-Up Agent ---
-def answer_followup(followup_question: str, session_data: Dict[str, Any]) -> str:
-    print(f"Answering follow-up question: {followup_question}")
+def answer_followup(
+    followup_question: str, session_data: Dict[str, Any], memory: Dict[str, Any] = None
+) -> str:
     """Provides accurate and unbiased answers to follow-up questions 
-    related to the truth analysis report. Utilizes session data, 
-    including the report, visualizations, and objectivity feedback. 
-    May conduct additional research using tools if needed.
+    related to the truth analysis report. Retrieves only the research
+    snippets, report sections and analysis chunks most relevant to the
+    question from the session's evidence index, along with the compacted
+    history of earlier follow-ups.
     """
-    global active_websocket # Declare active_websocket as global
-    # Extract relevant data from session_data
+    logger.info("Answering follow-up question", extra=fields(question=followup_question))
     claim = session_data.get('claim')
-    report = session_data.get('draft_report')
-    visualizations = session_data.get('visualizations')
-    objectivity_feedback = session_data.get('objectivity_feedback')
-    
-    # Format data for presentation to the LLM
-    context = f"Claim: {claim}\nReport: {report}\nVisualizations: {visualizations}\nObjectivity Feedback: {objectivity_feedback}"
+    session_id = session_data.get('session_id')
+    if session_id:
+        index = get_session_index(session_id, session_data)
+    else:
+        index = BM25Index(build_session_chunks(session_data))
+
+    # Format the retrieved chunks for presentation to the LLM
+    excerpts = index.search(followup_question, k=FOLLOWUP_TOP_K)
+    formatted_excerpts = "\n\n".join(
+        f"[{i+1}] {chunk['kind']} - {chunk['label']}:\n{chunk['text']}"
+        for i, (chunk, _score) in enumerate(excerpts)
+    ) or "No relevant excerpts found."
+    context = f"Claim: {claim}\nRelevant Excerpts:\n{formatted_excerpts}"
+    history = format_followup_memory(memory or {})
+    if history:
+        context += f"\n\nConversation So Far:\n{history}"
 
-    response = openai_client.chat.completions.create(
+    answer = chat_completion(
         model="gpt-4o",
+        stage="followup",
         messages=[
             {
                 "role": "system",
                 "content": """You are an AI assistant providing detailed and accurate 
                               answers to follow-up questions about truth analysis reports. 
-                              Use the provided information to formulate your response, 
+                              Use the provided excerpts to formulate your response, 
                               and maintain objectivity and neutrality. If you need to 
                               conduct additional research, use available tools. 
                               Do not include any information about your cutoff date or that you are an AI agent. """
@@ -46,14 +61,14 @@ def answer_followup(followup_question: str, session_data: Dict[str, Any]) -> str
         ],
         temperature=0.3
     )
-    print(response.choices[0].message.content.strip())
+    logger.debug("Follow-up answer", extra=fields(sample=True, answer=answer))
     # Send agent_update message 
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": followup_agent.name,
-        "content": f"## Follow-up Answer:\n\n{response.choices[0].message.content.strip()}"
-    }))
-    return response.choices[0].message.content.strip()
+        "content": f"## Follow-up Answer:\n\n{answer}"
+    })
+    return answer
 
 followup_agent = Agent(
     name='Follow-Up Agent',
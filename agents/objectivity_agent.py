@@ -1,16 +1,16 @@
-import os
-import asyncio
+import logging
+from typing import Dict, Any, List
 import websockets
-from openai import OpenAI
 from swarm import Swarm, Agent 
 from swarm.types import Result # Import Result from swarm.types
+from utils.llm import chat_completion
+from utils.progress import send_update
 
 # Correct import to avoid circular import
 from agents.data_visualization_reporting_agent import visualization_agent, visualization_handoff
-from agents.user_feedback_explanation_agent import feedback_agent, feedback_handoff  
+from utils.log import fields
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
 
 # --- Objectivity Agent ---
 def check_objectivity(draft_report: str, rephrased_claim: str, analysis: str) -> str:
@@ -19,9 +19,10 @@ def check_objectivity(draft_report: str, rephrased_claim: str, analysis: str) ->
     fallacies, and source credibility. Provides specific suggestions for
     improving objectivity.
     """
-    print("Checking for biases...")
-    response = openai_client.chat.completions.create(
+    logger.info("Checking objectivity")
+    objectivity_feedback = chat_completion(
         model="gpt-4o",
+        stage="objectivity",
         messages=[
             {
                 "role": "system",
@@ -42,28 +43,30 @@ def check_objectivity(draft_report: str, rephrased_claim: str, analysis: str) ->
         ],
         temperature=0.3,  # Lower temperature for more analytical responses
     )
-    objectivity_feedback = response.choices[0].message.content.strip()
-    print("Objectivity Feedback:", objectivity_feedback)
+    logger.debug("Objectivity feedback", extra=fields(sample=True, objectivity_feedback=objectivity_feedback))
     return objectivity_feedback
 
-def objectivity_handoff(objectivity_feedback: str) -> Result:
+def objectivity_handoff(
+    objectivity_feedback: str,
+    rephrased_claim: str = "",
+    analysis: str = "",
+    research_data: Dict[str, Any] = None,
+    subclaims: List[str] = None,
+) -> Result:
     """Handoff function to pass objectivity feedback 
     to the Data Visualization Agent. 
     """
-    global active_websocket # Declare active_websocket as global
-    # Get results from visualization_agent
-    intermediate_result = visualization_handoff(objectivity_feedback)
-    # Extract the visualizations from intermediate_result
-    visualizations = intermediate_result.context_variables.get("visualizations")
+    # Get results from visualization_agent (which hands off to the feedback agent)
+    result = visualization_handoff(objectivity_feedback, rephrased_claim, analysis, research_data, subclaims)
     # Send agent_update message 
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": objectivity_agent.name,
         "content": f"## Objectivity Feedback:\n\n{objectivity_feedback}"
-    }))
+    })
 
-    # Pass the visualizations to feedback_handoff 
-    return feedback_handoff(visualizations)
+    result.context_variables.setdefault("objectivity_feedback", objectivity_feedback)
+    return result
 
 # Define the agent at the bottom of the file
 objectivity_agent = Agent(
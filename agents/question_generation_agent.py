@@ -1,16 +1,18 @@
-import os
-from typing import List
-import asyncio
+import logging
+from typing import Dict, List
 import websockets
-from openai import OpenAI
 from swarm import Swarm, Agent 
 from swarm.types import Result # Import Result from swarm.types
+from utils.progress import send_update
+from utils.dedup import clean_question, deduplicate_questions
+from utils.structured import structured_list
 
 # Import handoff function
 from agents.research_agent import research_handoff
+from agents.subclaim_agent import ANALYSIS_MODE, map_reduce_handoff
+from utils.log import fields
 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+logger = logging.getLogger(__name__)
 
 # Maximum number of Tavily searches allowed
 MAX_TAVILY_SEARCHES = 25
@@ -21,18 +23,35 @@ def generate_questions(subclaims: List[str], chain_of_thought: str) -> List[str]
     prioritizing questions that can be answered through research using
     publicly available information and data. Questions are limited to
     between 4 and 400 characters to comply with Tavily's requirements.
+    Non-question lines are dropped and near-duplicates across sub-claims
+    are collapsed before the MAX_TAVILY_SEARCHES cap is applied.
     """
-    print("Generating Research Questions...")
+    question_groups = generate_question_groups(subclaims, chain_of_thought)
+    return [question for questions in question_groups.values() for question in questions]
+
+def generate_question_groups(subclaims: List[str], chain_of_thought: str) -> Dict[str, List[str]]:
+    """Generates the research questions like `generate_questions`, keeping
+    them grouped by the sub-claim they were generated for. A question kept
+    after de-duplication belongs only to the first sub-claim that asked it.
+    """
+    logger.info("Generating research questions", extra=fields(subclaims=len(subclaims)))
+    question_groups = {}
     research_questions = []
     for i, subclaim in enumerate(subclaims):
-        response = openai_client.chat.completions.create(
+        # Keep only actual questions, dropping headers and preambles
+        questions = structured_list(
             model="gpt-4o",
+            stage="questions",
+            key="questions",
+            max_items=3,
+            validate=clean_question,
             messages=[
                 {
                     "role": "system",
                     "content": f"""Generate 3 research questions for sub-claim {i+1} that are between 4 
                                   and 400 characters long and can be answered using publicly available 
-                                  information. Consider this chain of thought: """,
+                                  information. Return them as a JSON object with a 'questions' list, one 
+                                  question per item. Consider this chain of thought: """,
                 },
                 {
                     "role": "user",
@@ -41,29 +60,42 @@ def generate_questions(subclaims: List[str], chain_of_thought: str) -> List[str]
             ],
             temperature=0.5,
         )
-        questions_text = response.choices[0].message.content.strip()
-        questions = [line.strip() for line in questions_text.split("\n") if line.strip()]
+        question_groups.setdefault(subclaim, []).extend(questions)
         research_questions.extend(questions)
 
+    # Collapse near-duplicate questions from overlapping sub-claims
+    research_questions, duplicates = deduplicate_questions(research_questions)
+    logger.info("Dropped near-duplicate research questions", extra=fields(dropped=duplicates))
+
     # Limit the number of research questions for Tavily
     research_questions = research_questions[:MAX_TAVILY_SEARCHES] 
     
-    print("Research Questions:", research_questions)
-    return research_questions
+    logger.info("Research questions generated", extra=fields(count=len(research_questions), questions=research_questions))
+
+    remaining = set(research_questions)
+    for subclaim, questions in question_groups.items():
+        question_groups[subclaim] = [q for q in questions if q in remaining]
+        remaining.difference_update(question_groups[subclaim])
+    return question_groups
 
-def question_generation_handoff(subclaims: List[str], chain_of_thought: str) -> Result:
+def question_generation_handoff(
+    subclaims: List[str], chain_of_thought: str, rephrased_claim: str = ""
+) -> Result:
     """Handoff function to pass the research questions
-    to the Research Agent.
+    to the Research Agent, or with ANALYSIS_MODE=map_reduce to the
+    per-sub-claim research and analysis.
     """
-    global active_websocket # Declare active_websocket as global
-    research_questions = generate_questions(subclaims, chain_of_thought)
+    question_groups = generate_question_groups(subclaims, chain_of_thought)
+    research_questions = [question for questions in question_groups.values() for question in questions]
     # Send agent_update message 
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": question_generation_agent.name,
         "content": f"## Research Questions:\n\n{research_questions}"
-    }))
-    return research_handoff(research_questions)
+    })
+    if ANALYSIS_MODE == "map_reduce":
+        return map_reduce_handoff(question_groups, rephrased_claim, chain_of_thought)
+    return research_handoff(research_questions, rephrased_claim, chain_of_thought, subclaims)
 
 question_generation_agent = Agent(
     name="Question Generation Agent",
@@ -1,71 +1,228 @@
 import os
+import logging
+import re
+import time
+import threading
+import contextvars
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import List, Dict, Any
-import asyncio
 import websockets
-from openai import OpenAI
 from tavily import TavilyClient
 from swarm import Agent
 from swarm.types import Result
+from utils.cache import search_cache, make_cache_key
+from utils.evidence_store import load_search, load_stale_search, search_stored, store_search
+from utils.evidence import get_evidence_artifact
+from utils.records import EvidenceRecord, records_from_tavily
+from utils.progress import send_update
+from utils.domains import DEFAULT_DOMAINS
+from utils.topics import route_domains
+from utils.deadlines import degraded_stages, record_degraded_stage, remaining_claim_time
+from utils.breaker import CircuitOpenError, search_breaker
+from utils.saturation import (
+    RESEARCH_MODE, RESEARCH_MAX_SEARCHES, RESEARCH_TIME_BUDGET, EvidenceSaturation
+)
+from utils.rerank import RERANK_TOP_K, rerank_results
 from agents.analyst_agent import analyst_handoff
+from utils.log import fields
+from utils.profiling import call_timer
+
+logger = logging.getLogger(__name__)
 
 # Initialize clients
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
 
+# Retry a topic-routed search on every default domain when it finds nothing
+TOPIC_FALLBACK_ON_EMPTY = os.getenv("TOPIC_FALLBACK_ON_EMPTY", "true").lower() == "true"
+
+# Speculative prefetch of evidence for the rephrased claim
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+PREFETCH_PERSPECTIVES = int(os.getenv("PREFETCH_PERSPECTIVES", 2))
+PREFETCH_WAIT = float(os.getenv("PREFETCH_WAIT", 10))
+_prefetch_executor = ThreadPoolExecutor(max_workers=int(os.getenv("PREFETCH_WORKERS", 4)))
+_prefetches = OrderedDict()  # rephrased claim -> {query: Future}
+_prefetches_lock = threading.Lock()
+
 # --- Research Agent ---
-def search_tavily(question: str, domains: List[str] = None) -> List[dict]:
-    print(f"Searching for: {question} using the cognative API...")
+def search_tavily(question: str, domains: List[str] = None) -> List[EvidenceRecord]:
     """Searches for information using the Tavily API, focusing on
-    reliable sources within specified domains.
+    reliable sources within specified domains. Without explicit domains,
+    the question is routed to the domains of its topic, falling back to
+    DEFAULT_DOMAINS when no topic matches or the routed search is empty.
     """
     if domains is None:
-        domains = [
-            "cia.gov",
-            "fbi.gov",
-            "state.gov",
-            "congress.gov",
-            "uscis.gov",
-            "nasa.gov",
-            "nih.gov",
-            "cdc.gov",
-            "epa.gov",
-            "treasury.gov",
-            "justice.gov",
-            "defense.gov",
-            "energy.gov",
-            "commerce.gov",
-            "labor.gov",
-            "transportation.gov",
-            "hud.gov",
-            "education.gov",
-            "va.gov",
-        ]
-    results = tavily_client.search(question, include_domains=domains, max_results=5)
-    print("Tavily results:", results)  # Debugging print
-    return results.get("results", [])
+        domains, topics = route_domains(question)
+        results = search_tavily(question, domains)
+        if results or not topics or not TOPIC_FALLBACK_ON_EMPTY:
+            return results
+        logger.info("Routed search was empty, searching all domains", extra=fields(question=question, topics=topics))
+        return search_tavily(question, DEFAULT_DOMAINS)
+    cache_key = make_cache_key("tavily", question, domains)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        logger.info("Search cache hit", extra=fields(question=question))
+        return cached
+    # Reuse results another session or process already fetched
+    shared = load_search(question, domains)
+    if shared is not None:
+        logger.info("Shared evidence hit", extra=fields(question=question))
+        search_cache.set(cache_key, shared)
+        return shared
+    logger.info("Searching Tavily", extra=fields(question=question, domains=len(domains)))
+    try:
+        with call_timer("search", question, domains=len(domains)):
+            # Fails fast while Tavily is down or slow (see utils.breaker)
+            response = search_breaker.call(tavily_client.search, question, include_domains=domains, max_results=5)
+    except Exception as e:
+        return degraded_search(question, domains, e)
+    results = records_from_tavily(response)
+    logger.debug("Tavily results", extra=fields(sample=True, question=question, results=results))
+    search_cache.set(cache_key, results)
+    store_search(question, domains, results)
+    return results
+
+def degraded_search(question: str, domains: List[str], error: Exception) -> List[EvidenceRecord]:
+    """Cache-only fallback when a search fails or the search breaker is
+    open: the search's last stored results, however old, or none. The run
+    is flagged as degraded ("search" in `degraded_stages`) and nothing is
+    cached, so the search runs again once Tavily recovers.
+    """
+    if not isinstance(error, CircuitOpenError):
+        logger.warning("Search failed", extra=fields(question=question, error=str(error)))
+    if "search" not in degraded_stages():
+        send_update({"type": "thinking", "content": "Search is unavailable, using previously stored evidence only."})
+    record_degraded_stage("search")
+    results = load_stale_search(question, domains) or []
+    logger.info("Serving stored evidence", extra=fields(question=question, results=len(results)))
+    return results
+
+def search_expired(question: str) -> bool:
+    """Whether `search_tavily(question)` would have to search again because
+    its shared results (routed, or the fallback to every domain) expired.
+    """
+    domains, topics = route_domains(question)
+    if search_stored(question, domains):
+        return False
+    return not (topics and TOPIC_FALLBACK_ON_EMPTY and search_stored(question, DEFAULT_DOMAINS))
 
-def research_handoff(research_questions: List[str]) -> Result:
-    """Conducts research on each question using Tavily and hands off
-    to the Analyst Agent.
+def stored_search(question: str) -> List[EvidenceRecord]:
+    """The last stored results of `search_tavily(question)` (routed, and
+    the fallback to every domain), however old and before any reranking,
+    or none.
     """
-    global active_websocket # Declare active_websocket as global
-    print("Entering research_handoff...")  # Debug print
+    domains, topics = route_domains(question)
+    results = load_stale_search(question, domains) or []
+    if topics and TOPIC_FALLBACK_ON_EMPTY:
+        results += load_stale_search(question, DEFAULT_DOMAINS) or []
+    return results
+
+def prefetch_evidence(rephrased_claim: str, queries: List[str], limit: int = None) -> None:
+    """Starts background searches for the given queries as soon as the
+    rephrased claim is known. Results warm the search cache and are merged
+    into the research data when research_handoff runs for the same claim.
+    At most `limit` usable queries are searched.
+    """
+    if not PREFETCH_ENABLED or not rephrased_claim:
+        return
+    with _prefetches_lock:
+        futures = _prefetches.setdefault(rephrased_claim, {})
+        started = 0
+        for query in queries:
+            # Strip list markers and markdown, and skip headers like "Perspectives:"
+            query = re.sub(r"^\s*(?:[-*•]+|\d+[.)])\s*", "", query).replace("**", "").strip()[:400]
+            if len(query) < 4 or query.endswith(":") or query in futures:
+                continue
+            if limit is not None and started >= limit:
+                break
+            started += 1
+            logger.info("Prefetching evidence", extra=fields(query=query))
+            # Run in a copy of the caller's context so logs keep the session id
+            futures[query] = _prefetch_executor.submit(contextvars.copy_context().run, search_tavily, query)
+        _prefetches.move_to_end(rephrased_claim)
+        while len(_prefetches) > 256:
+            _prefetches.popitem(last=False)
+
+def collect_prefetched(rephrased_claim: str) -> Dict[str, List[EvidenceRecord]]:
+    """Returns the prefetched results for a claim, waiting at most
+    PREFETCH_WAIT seconds for searches still in flight.
+    """
+    with _prefetches_lock:
+        futures = _prefetches.pop(rephrased_claim, {})
+    wait(futures.values(), timeout=PREFETCH_WAIT)
+    return {
+        query: future.result()
+        for query, future in futures.items()
+        if future.done() and future.exception() is None
+    }
+
+def research_handoff(
+    research_questions: List[str], rephrased_claim: str = "", chain_of_thought: str = "", subclaims: List[str] = None
+) -> Result:
+    """Conducts research on each question using Tavily, reranks the results
+    against the question and the rephrased claim, and hands off the best
+    RERANK_TOP_K results per question to the Analyst Agent. With
+    RESEARCH_MODE=adaptive, searching stops early once results saturate or
+    the per-claim time/search budget is spent; the stop reason is reported
+    in the `research_stats` context variable.
+    """
+    logger.info("Starting research", extra=fields(questions=len(research_questions)))
     research_results = {}
+    searched = []
+    saturation = EvidenceSaturation()
+    started = time.monotonic()
+    stop_reason = "completed"
+
+    # Start from any evidence prefetched while the earlier stages ran
+    prefetched = collect_prefetched(rephrased_claim)
+    for query, results in prefetched.items():
+        research_results[query] = results
+        saturation.add(results)
+
     for question in research_questions:
-        print(f"Researching question: {question}")  # Debug print
+        if question in research_results:
+            continue
+        # Keep time for the later stages once the claim deadline has passed
+        if remaining_claim_time() <= 0:
+            stop_reason = "claim_deadline"
+        # In adaptive mode, stop once new searches stop adding evidence
+        elif RESEARCH_MODE == "adaptive":
+            if saturation.saturated:
+                stop_reason = "saturated"
+            elif time.monotonic() - started > RESEARCH_TIME_BUDGET:
+                stop_reason = "time_budget"
+            elif len(searched) >= RESEARCH_MAX_SEARCHES:
+                stop_reason = "search_budget"
+        if stop_reason != "completed":
+            break
+        logger.info("Researching question", extra=fields(question=question))
         tavily_results = search_tavily(question)
+        searched.append(question)
         research_results[question] = tavily_results
-    print("Research results:", research_results)  # Debug print
-    rephrased_claim = "Rephrased Claim"
-    chain_of_thought = "Chain of Thought"
+        saturation.add(tavily_results)
+    research_stats = {
+        "stop_reason": stop_reason,
+        "searches": len(searched),
+        "prefetched": len(prefetched),
+        # Questions neither searched nor answered by a prefetched search
+        "skipped_questions": len([q for q in research_questions if q not in research_results]),
+        "novelty": [round(n, 3) for n in saturation.history],
+        "elapsed_seconds": round(time.monotonic() - started, 2),
+        "degraded": "search" in degraded_stages(),
+    }
+    logger.info("Research finished", extra=fields(**research_stats))
+    research_results = rerank_results(research_results, rephrased_claim, RERANK_TOP_K)
+    logger.debug("Research results", extra=fields(sample=True, research_results=research_results))
     # Send agent_update message 
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": research_agent.name,
-        "content": f"## Research Results:\n\n{research_results}"
-    }))
-    return analyst_handoff(rephrased_claim, chain_of_thought, research_results)
+        "content": f"## Research Results:\n\n{get_evidence_artifact(research_results).render()}"
+    })
+    result = analyst_handoff(rephrased_claim, chain_of_thought, research_results, subclaims)
+    result.context_variables["research_stats"] = research_stats
+    return result
 
 
 research_agent = Agent(
@@ -0,0 +1,195 @@
+import os
+import logging
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from swarm import Agent
+from swarm.types import Result
+from utils.llm import chat_completion
+from utils.progress import send_update
+from utils.evidence import get_evidence_artifact
+from utils.tokens import truncate_to_tokens
+from utils.depth import pipeline_depth
+from utils.deadlines import degraded_stages, remaining_claim_time
+from utils.rerank import RERANK_TOP_K, rerank_results
+from utils.records import EvidenceRecord
+from agents.research_agent import research_agent, research_handoff, search_tavily, collect_prefetched
+from agents.analyst_agent import analyst_agent, analyze_research
+from agents.argumentation_mining_agent import argumentation_handoff, mine_arguments
+from utils.log import fields
+
+logger = logging.getLogger(__name__)
+
+# "single" analyzes all evidence in one prompt; "map_reduce" researches and
+# analyzes each sub-claim on its own evidence, then merges the verdicts
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "single")
+# Sub-claims researched and analyzed at the same time in map-reduce mode
+SUBCLAIM_WORKERS = int(os.getenv("SUBCLAIM_WORKERS", 5))
+# Token budget for the per-sub-claim verdicts in the reduce prompt
+REDUCE_PROMPT_TOKENS = int(os.getenv("REDUCE_PROMPT_TOKENS", 8000))
+
+
+# --- Sub-claim Analysis Agent ---
+def analyze_subclaim(
+    subclaim: str,
+    questions: List[str],
+    chain_of_thought: str,
+    prefetched: Dict[str, List[EvidenceRecord]],
+) -> Dict[str, Any]:
+    """Map step: researches one sub-claim's questions, then analyzes and
+    mines arguments on that sub-claim's evidence only. Argument mining is
+    skipped at the "quick" pipeline depth.
+    """
+    research_data = {}
+    searches = 0
+    stop_reason = "completed"
+    for question in questions:
+        if question in prefetched:
+            research_data[question] = prefetched[question]
+            continue
+        # Keep time for the later stages once the claim deadline has passed
+        if remaining_claim_time() <= 0:
+            stop_reason = "claim_deadline"
+            break
+        research_data[question] = search_tavily(question)
+        searches += 1
+    research_data = rerank_results(research_data, subclaim, RERANK_TOP_K)
+
+    analysis = analyze_research(subclaim, chain_of_thought, research_data)
+    argumentation_analysis = None
+    if pipeline_depth() != "quick":
+        argumentation_analysis = mine_arguments(subclaim, analysis, research_data)
+    return {
+        "subclaim": subclaim,
+        "questions": questions,
+        "research_data": research_data,
+        "analysis": analysis,
+        "argumentation_analysis": argumentation_analysis,
+        "searches": searches,
+        "stop_reason": stop_reason,
+    }
+
+
+def reduce_analyses(rephrased_claim: str, chain_of_thought: str, subclaim_analyses: List[Dict[str, Any]]) -> str:
+    """Reduce step: merges the per-sub-claim verdicts into the overall
+    analysis of the claim.
+    """
+    logger.info("Merging sub-claim analyses", extra=fields(subclaims=len(subclaim_analyses)))
+    per_subclaim_tokens = REDUCE_PROMPT_TOKENS // max(1, len(subclaim_analyses))
+    verdicts = "\n\n".join(
+        f"Sub-claim {i + 1}: {item['subclaim']}\nAnalysis: {truncate_to_tokens(item['analysis'], per_subclaim_tokens)}"
+        for i, item in enumerate(subclaim_analyses)
+    )
+
+    analysis = chat_completion(
+        model="gpt-4o",
+        stage="reduce",
+        messages=[
+            {
+                "role": "system",
+                "content": """Combine the analyses of the claim's sub-claims into one overall analysis of
+                              the claim's truthfulness. State the verdict for each sub-claim, how much each
+                              one matters to the claim as a whole, and where the sub-claim findings agree or
+                              conflict. Be thorough and present your analysis in a well-organized way.
+                              Do not include any information about your cutoff date or that you are an AI agent.""",
+            },
+            {
+                "role": "user",
+                "content": f"Claim: {rephrased_claim}\nChain of Thought: {chain_of_thought}\n\n{verdicts}",
+            },
+        ],
+        temperature=0.3,
+    )
+    logger.debug("Merged analysis", extra=fields(sample=True, analysis=analysis))
+    return analysis
+
+
+def map_reduce_handoff(
+    question_groups: Dict[str, List[str]], rephrased_claim: str = "", chain_of_thought: str = ""
+) -> Result:
+    """Researches, analyzes and mines arguments for every sub-claim in
+    parallel, merges the sub-claim verdicts into the overall analysis and
+    hands off to drafting with the per-sub-claim arguments. Follows the
+    pipeline depth the same way as the single-prompt analysis.
+    """
+    groups = {subclaim: questions for subclaim, questions in question_groups.items() if questions}
+    if not groups:
+        return research_handoff([], rephrased_claim, chain_of_thought, list(question_groups))
+    logger.info("Starting map-reduce analysis", extra=fields(subclaims=len(groups)))
+    started = time.monotonic()
+    prefetched = collect_prefetched(rephrased_claim)
+
+    # Each worker runs in its own copy of this context (deadline, depth, socket)
+    with ThreadPoolExecutor(max_workers=max(1, min(SUBCLAIM_WORKERS, len(groups)))) as executor:
+        futures = [
+            executor.submit(
+                contextvars.copy_context().run, analyze_subclaim, subclaim, questions, chain_of_thought, prefetched
+            )
+            for subclaim, questions in groups.items()
+        ]
+        subclaim_analyses = [future.result() for future in futures]
+
+    skipped = sum(len(item["questions"]) - len(item["research_data"]) for item in subclaim_analyses)
+    research_data = {}
+    for item in subclaim_analyses:
+        research_data.update(item.pop("research_data"))
+    # Prefetched evidence for the whole claim that no sub-claim asked for
+    extra = {query: results for query, results in prefetched.items() if query not in research_data}
+    if extra:
+        research_data.update(rerank_results(extra, rephrased_claim, RERANK_TOP_K))
+
+    stopped = [item["stop_reason"] for item in subclaim_analyses if item["stop_reason"] != "completed"]
+    research_stats = {
+        "mode": "map_reduce",
+        "stop_reason": stopped[0] if stopped else "completed",
+        # Prefetched queries are not counted, they were searched earlier
+        "searches": sum(item["searches"] for item in subclaim_analyses),
+        "prefetched": len(prefetched),
+        "skipped_questions": skipped,
+        "elapsed_seconds": round(time.monotonic() - started, 2),
+        "degraded": "search" in degraded_stages(),
+    }
+    logger.info("Map step finished", extra=fields(**research_stats))
+    send_update({
+        "type": "agent_update",
+        "agent": research_agent.name,
+        "content": f"## Research Results:\n\n{get_evidence_artifact(research_data).render()}"
+    })
+
+    analysis = reduce_analyses(rephrased_claim, chain_of_thought, subclaim_analyses)
+    send_update({
+        "type": "agent_update",
+        "agent": analyst_agent.name,
+        "content": f"## Analysis:\n\n{analysis}"
+    })
+
+    analysis_context = {
+        "rephrased_claim": rephrased_claim,
+        "chain_of_thought": chain_of_thought,
+        "research_data": research_data,
+        "research_stats": research_stats,
+        "analysis": analysis,
+        "subclaim_analyses": subclaim_analyses,
+        "subclaims": list(question_groups),
+    }
+    if pipeline_depth() == "quick":
+        return Result(value="Completed the quick analysis.", context_variables=analysis_context)
+
+    argumentation_analysis = "\n\n".join(
+        f"### Sub-claim: {item['subclaim']}\n\n{item['argumentation_analysis']}" for item in subclaim_analyses
+    )
+    result = argumentation_handoff(
+        rephrased_claim, analysis, research_data, argumentation_analysis, list(question_groups)
+    )
+    for key, value in analysis_context.items():
+        result.context_variables.setdefault(key, value)
+    return result
+
+
+subclaim_agent = Agent(
+    name="Sub-claim Analysis Agent",
+    instructions="Research and analyze each sub-claim on its own evidence, then merge the verdicts.",
+    functions=[analyze_subclaim, reduce_analyses, map_reduce_handoff],
+)
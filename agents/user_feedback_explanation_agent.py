@@ -1,13 +1,13 @@
-import os
+import logging
 from typing import Dict, Any, List
-import asyncio
 import websockets
-from openai import OpenAI
 from swarm import Agent
 from swarm.types import Result 
-# Initialize OpenAI client
-openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from utils.llm import chat_completion
+from utils.progress import send_update
+from utils.log import fields
 
+logger = logging.getLogger(__name__)
 
 # --- User Feedback & Explanation Agent ---
 def generate_feedback(
@@ -21,9 +21,10 @@ def generate_feedback(
     concise, and understandable way. Incorporates visualizations
     and objectivity feedback for a comprehensive explanation.
     """
-    print("Generating Feedback...")
-    response = openai_client.chat.completions.create(
+    logger.info("Generating feedback")
+    user_feedback = chat_completion(
         model="gpt-4o",
+        stage="feedback",
         messages=[
             {
                 "role": "system",
@@ -43,8 +44,7 @@ def generate_feedback(
         ],
         temperature=0.5,
     )
-    user_feedback = response.choices[0].message.content.strip()
-    print("User Feedback:", user_feedback)
+    logger.debug("User feedback", extra=fields(sample=True, user_feedback=user_feedback))
     return user_feedback
 
 
@@ -52,13 +52,12 @@ def feedback_handoff(user_feedback: str) -> Result:
     """Handoff function to store the final user feedback in context variables.
     Since this is the last agent, there's no agent to hand off to.
     """
-    global active_websocket # Declare active_websocket as global
     # Send agent_update message 
-    asyncio.run(active_websocket.send_json({
+    send_update({
         "type": "agent_update",
         "agent": feedback_agent.name,
         "content": f"## User Feedback:\n\n{user_feedback}"
-    }))
+    })
     return Result(
         value="Generated user feedback and explanations.",
         context_variables={"user_feedback": user_feedback},
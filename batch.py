@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from utils.cache import search_cache, llm_cache
+
+# Default number of claims verified concurrently in batch mode
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 4))
+# Most workers a POST /claims/batch request may ask for
+BATCH_WORKERS_MAX = int(os.getenv("BATCH_WORKERS_MAX", 16))
+
+# Pipeline outputs included in each batch result line
+BATCH_RESULT_FIELDS = [
+    "rephrased_claim",
+    "subclaims",
+    "analysis",
+    "draft_report",
+    "user_feedback",
+    "degraded_stages",
+]
+
+
+class BatchStats:
+    """Tracks throughput and failures for a batch run."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.succeeded = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            if ok:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def summary(self) -> Dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        total = self.succeeded + self.failed
+        return {
+            "total": total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 2),
+            "claims_per_minute": round(total / elapsed * 60, 2) if elapsed else 0.0,
+            "search_cache": search_cache.stats(),
+            "llm_cache": llm_cache.stats(),
+        }
+
+
+def read_claims(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """Parses JSONL claim lines. Each line is either a JSON object with a
+    `claim` field (and an optional `id`) or a bare JSON string.
+    """
+    claims = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        item = json.loads(line)
+        if isinstance(item, str):
+            item = {"claim": item}
+        if not item.get("claim"):
+            raise ValueError(f"Line {line_number} has no 'claim' field.")
+        item.setdefault("id", str(line_number))
+        claims.append(item)
+    return claims
+
+
+def run_batch(
+    claims: List[Dict[str, Any]],
+    run_claim: Callable[[str, str], Dict[str, Any]],
+    workers: int = BATCH_WORKERS,
+    stats: BatchStats = None,
+    result_fields: List[str] = BATCH_RESULT_FIELDS,
+) -> Iterator[Dict[str, Any]]:
+    """Runs every claim through `run_claim` on a pool of worker threads and
+    yields one result record per claim as soon as it finishes, with the
+    `result_fields` of its pipeline output. All workers share the
+    process-wide search and LLM caches.
+    """
+    stats = stats or BatchStats()
+
+    def verify(item: Dict[str, Any]) -> Dict[str, Any]:
+        session_id = str(uuid.uuid4())
+        started = time.monotonic()
+        record = {"id": item["id"], "claim": item["claim"], "session_id": session_id}
+        try:
+            context_variables = run_claim(item["claim"], session_id)
+            record["status"] = "ok"
+            record.update({k: context_variables[k] for k in result_fields if k in context_variables})
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+        record["elapsed_seconds"] = round(time.monotonic() - started, 2)
+        return record
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(verify, item) for item in claims]
+        for future in as_completed(futures):
+            record = future.result()
+            stats.record(record["status"] == "ok")
+            yield record
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Verify a JSONL file of claims in batch.")
+    parser.add_argument("claims_file", help="JSONL file with one claim per line")
+    parser.add_argument("-o", "--output", help="JSONL results file (defaults to stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=BATCH_WORKERS, help="Number of parallel workers")
+    args = parser.parse_args(argv)
+
+    # Imported lazily so the module can be used by main.py without a cycle
+    from main import run_claim_pipeline
+
+    with open(args.claims_file, "r", encoding="utf-8") as f:
+        claims = read_claims(f)
+
+    stats = BatchStats()
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for record in run_batch(claims, run_claim_pipeline, args.workers, stats):
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    print(json.dumps(stats.summary(), indent=2), file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+import subprocess
+import urllib.request
+from typing import Any, Dict, List
+
+import websockets
+
+from batch import read_claims
+
+# Claims in flight per web worker
+LOADTEST_CONCURRENCY = int(os.getenv("LOADTEST_CONCURRENCY", 4))
+# Seconds a claim may take before it counts as failed
+LOADTEST_CLAIM_TIMEOUT = float(os.getenv("LOADTEST_CLAIM_TIMEOUT", 300))
+# Seconds to wait for a server started by --sweep to come up
+LOADTEST_STARTUP_TIMEOUT = float(os.getenv("LOADTEST_STARTUP_TIMEOUT", 60))
+
+
+async def check_claim(url: str, claim: str, depth: str) -> float:
+    """Verifies one claim over a fresh session's WebSocket and returns the
+    seconds until its final report.
+    """
+    started = time.monotonic()
+    async with websockets.connect(f"{url}/ws/{uuid.uuid4()}", max_size=None) as ws:
+        # The early report is enough; background completion would skew the next claim
+        await ws.send(json.dumps({"type": "new_question", "content": claim, "depth": depth, "continue": False}))
+        while True:
+            message = json.loads(await ws.recv())
+            if message["type"] == "final_report":
+                return time.monotonic() - started
+            if message["type"] == "error":
+                raise RuntimeError(message["content"])
+
+
+async def run_load(url: str, claims: List[str], concurrency: int, depth: str) -> Dict[str, Any]:
+    """Sends the claims with `concurrency` in flight and summarizes
+    throughput and latency.
+    """
+    queue = asyncio.Queue()
+    for claim in claims:
+        queue.put_nowait(claim)
+    latencies, errors = [], []
+
+    async def client() -> None:
+        while not queue.empty():
+            claim = queue.get_nowait()
+            try:
+                latencies.append(await asyncio.wait_for(check_claim(url, claim, depth), LOADTEST_CLAIM_TIMEOUT))
+            except Exception as e:
+                errors.append(str(e) or type(e).__name__)
+
+    started = time.monotonic()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        "claims": len(claims),
+        "succeeded": len(latencies),
+        "failed": len(errors),
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 2),
+        "claims_per_minute": round(len(latencies) * 60 / elapsed, 2) if elapsed else 0.0,
+        "p50_seconds": round(statistics.median(latencies), 2) if latencies else None,
+        "p95_seconds": round(latencies[int(0.95 * (len(latencies) - 1))], 2) if latencies else None,
+        "errors": errors[:5],
+    }
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    """Starts `main.py` with the given worker count and waits until it answers."""
+    env = {**os.environ, "WEB_WORKERS": str(workers), "WEB_PORT": str(port)}
+    server = subprocess.Popen([sys.executable, "main.py"], env=env, cwd=os.path.dirname(os.path.abspath(__file__)))
+    deadline = time.monotonic() + LOADTEST_STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=2)
+            return server
+        except OSError:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("Server did not start in time")
+
+
+def run_sweep(
+    claims: List[str], worker_counts: List[int], claims_per_worker: int, concurrency: int, depth: str, port: int
+) -> List[Dict[str, Any]]:
+    """Load-tests a fresh server at each worker count, scaling the load with
+    the workers, and reports the throughput relative to one worker.
+
+    Each step gets claims not sent before, so it measures the pipeline
+    rather than the shared LLM and evidence caches.
+    """
+    results, offset = [], 0
+    for workers in worker_counts:
+        count = claims_per_worker * workers
+        step_claims = [claims[(offset + i) % len(claims)] for i in range(count)]
+        if offset + count > len(claims):
+            print(f"Warning: only {len(claims)} claims, step with {workers} workers repeats some", file=sys.stderr)
+        offset += count
+
+        server = start_server(workers, port)
+        try:
+            stats = asyncio.run(run_load(f"ws://127.0.0.1:{port}", step_claims, concurrency * workers, depth))
+        finally:
+            server.terminate()
+            server.wait()
+        stats["workers"] = workers
+        results.append(stats)
+        print(json.dumps(stats), file=sys.stderr)
+
+    baseline = results[0]["claims_per_minute"] / results[0]["workers"] if results[0]["claims_per_minute"] else 0
+    for stats in results:
+        # 1.0 is perfectly linear scaling from the first step
+        stats["scaling_efficiency"] = (
+            round(stats["claims_per_minute"] / (baseline * stats["workers"]), 2) if baseline else None
+        )
+    return results
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test claim verification over WebSockets.")
+    parser.add_argument("claims_file", help="JSONL file with one claim per line")
+    parser.add_argument("--url", default="ws://127.0.0.1:8000", help="Server to test (ignored with --sweep)")
+    parser.add_argument("-c", "--concurrency", type=int, default=LOADTEST_CONCURRENCY, help="Claims in flight (per worker with --sweep)")
+    parser.add_argument("-n", "--claims", type=int, help="Claims to send (per worker with --sweep; default: the whole file)")
+    parser.add_argument("--depth", default="quick", choices=["quick", "standard", "full"])
+    parser.add_argument("--sweep", help="Comma-separated worker counts, e.g. 1,2,4: starts main.py at each and compares")
+    parser.add_argument("--port", type=int, default=8100, help="Port of the servers started by --sweep")
+    args = parser.parse_args(argv)
+
+    with open(args.claims_file, "r", encoding="utf-8") as f:
+        claims = [item["claim"] for item in read_claims(f)]
+    if not claims:
+        print("No claims to send.", file=sys.stderr)
+        return 1
+
+    if args.sweep:
+        worker_counts = [int(count) for count in args.sweep.split(",")]
+        # By default the file is split so that no step repeats a claim
+        claims_per_worker = args.claims or max(1, len(claims) // sum(worker_counts))
+        results = run_sweep(claims, worker_counts, claims_per_worker, args.concurrency, args.depth, args.port)
+        print(json.dumps(results, indent=2))
+        return 1 if any(stats["failed"] for stats in results) else 0
+
+    stats = asyncio.run(run_load(args.url, claims[:args.claims] if args.claims else claims, args.concurrency, args.depth))
+    print(json.dumps(stats, indent=2))
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
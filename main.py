@@ -1,5 +1,6 @@
 import os
 import json
+import time
 import uuid
 import logging
 from typing import List, Dict, Any
@@ -8,10 +9,10 @@ import asyncio
 import redis
 import requests
 from dotenv import load_dotenv
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from pydantic import BaseModel
 
 from openai import OpenAI
 from tavily import TavilyClient
@@ -23,7 +24,7 @@ from agents.clarification_agent import clarification_agent, clarification_handof
 from agents.cognitive_reasoning_agent import cognitive_reasoning_agent, cognitive_reasoning_handoff
 from agents.claim_decomposition_agent import claim_decomposition_agent, decomposition_handoff
 from agents.question_generation_agent import question_generation_agent, question_generation_handoff
-from agents.research_agent import research_agent, research_handoff
+from agents.research_agent import research_agent, research_handoff, search_expired, search_tavily, stored_search
 from agents.analyst_agent import analyst_agent, analyst_handoff
 from agents.argumentation_mining_agent import argumentation_mining_agent, argumentation_handoff
 from agents.drafter_agent import drafter_agent, drafting_handoff
@@ -31,12 +32,40 @@ from agents.objectivity_agent import objectivity_agent, objectivity_handoff
 from agents.data_visualization_reporting_agent import visualization_agent, visualization_handoff
 from agents.user_feedback_explanation_agent import feedback_agent, feedback_handoff
 from agents.followup_agent import followup_agent, answer_followup
+from utils.progress import bind_websocket
+from utils.deadlines import start_claim_deadline, degraded_stages
+from utils.retrieval import index_session
+from utils.evidence import get_evidence_artifact
+from utils.evidence_store import EVIDENCE_TTL, configure_evidence_store, dehydrate_research, hydrate_research
+from utils.followup_memory import (
+    load_followup_memory, save_followup_memory, clear_followup_memory, add_followup_turn
+)
+from batch import BATCH_WORKERS, BATCH_WORKERS_MAX, BatchStats, run_batch
+from utils.routing import MODEL_ROUTES, route_metrics
+from utils.structured import structured_metrics
+from utils.depth import PIPELINE_DEPTH, QUICK_EVIDENCE_TOKENS, set_pipeline_depth, validate_depth
+from utils.static_assets import StaticAssets, Templates
+from utils.log import bind_session_id, fields, setup_logging
+from utils.wire import WS_PER_MESSAGE_DEFLATE, MessageChannel, wire_totals
+from utils.relay import configure_relay, forward, relay_enabled, subscribe
+from utils.cluster import WEB_WORKERS, WORKER_ID, cluster_summary, configure_cluster, share_metrics
+from utils.breaker import llm_breaker, search_breaker
+from utils.cache import configure_shared_cache
+from utils.rerank import RERANK_TOP_K, rerank_results
+from utils.article import ARTICLE_WORKERS, aggregate_report, extract_claims, is_article
+from utils.profiling import (
+    configure_profiling, is_admin, list_profiles, load_profile, load_pstats, profile_reason, profile_run
+)
+from watchlist import (
+    WATCH_HISTORY, WATCH_INTERVAL_HOURS, WATCH_MIN_INTERVAL_HOURS, WATCH_MIN_NEW_EVIDENCE,
+    list_watched, new_evidence, unwatch, watch,
+)
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize logging
-logging.basicConfig(level=logging.INFO)
+# Initialize logging (queued, structured, tagged with the session id)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
@@ -51,14 +80,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount the static directory
-app.mount("/static", StaticFiles(directory="static"), name="static") 
+# Static assets and templates are cached in memory, compressed and fingerprinted
+static_assets = StaticAssets("static")
+templates = Templates("templates", static_assets)
 
 # Retrieve API keys and Redis configuration from environment
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
+# Sliding TTL of stored sessions; at most EVIDENCE_TTL, so a session never
+# outlives the evidence it references (reading it refreshes both)
+SESSION_TTL = min(int(os.getenv("SESSION_TTL", EVIDENCE_TTL)), EVIDENCE_TTL)
 
 # Validate API keys
 if not OPENAI_API_KEY:
@@ -77,6 +110,18 @@ except redis.ConnectionError as e:
     logger.error(f"Could not connect to Redis: {e}")
     raise e
 
+# Share fetched evidence across sessions through Redis
+configure_evidence_store(redis_client)
+# Store per-session profiles in Redis
+configure_profiling(redis_client)
+# Share LLM completions, socket messages and metrics between worker processes
+configure_shared_cache(redis_client)
+configure_relay(REDIS_HOST, REDIS_PORT)
+share_metrics("routes", route_metrics)
+share_metrics("wire", wire_totals)
+share_metrics("structured", structured_metrics)
+configure_cluster(redis_client)
+
 # Initialize OpenAI and Tavily clients
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
 tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
@@ -87,12 +132,21 @@ def generate_session_id():
     return str(uuid.uuid4())
 
 def store_session_data(session_id: str, data: Dict[str, Any]) -> None:
-    redis_client.set(session_id, json.dumps(data))
+    # Keep the evidence in the shared store and only references in the session
+    if "research_data" in data:
+        research_refs = dehydrate_research(redis_client, data["research_data"])
+        data = {k: v for k, v in data.items() if k != "research_data"}
+        data["research_refs"] = research_refs
+    redis_client.set(session_id, json.dumps(data), ex=SESSION_TTL)
 
 def get_session_data(session_id: str) -> Dict[str, Any]:
     data_json = redis_client.get(session_id)
     if data_json:
-        return json.loads(data_json)
+        redis_client.expire(session_id, SESSION_TTL)
+        data = json.loads(data_json)
+        if "research_refs" in data:
+            data["research_data"] = hydrate_research(redis_client, data.pop("research_refs"))
+        return data
     return None
 
 # -------------------------------------------------
@@ -107,15 +161,280 @@ misinformation_agent = Agent(
     tool_choice="auto"  
 )
 
+def run_claim_pipeline(claim: str, session_id: str, depth: str = "full", profile: bool = False) -> Dict[str, Any]:
+    """Runs a claim through the agent pipeline up to `depth`, stores the
+    results in the session and returns the session data. The run is
+    profiled when `profile` is set or it is sampled by PROFILE_SAMPLE_RATE.
+    Blocking; call from a worker thread.
+    """
+    bind_session_id(session_id)
+    # Store initial claim in session data and start a fresh follow-up history
+    store_session_data(session_id, {"claim": claim})
+    clear_followup_memory(redis_client, session_id)
+    start_claim_deadline()
+    set_pipeline_depth(depth)
+
+    reason = profile_reason(profile)
+    with profile_run(session_id, reason):
+        response = swarm_client.run(
+            agent=misinformation_agent,
+            messages=[{"role": "user", "content": claim}],
+            context_variables={"session_id": session_id},
+        )
+
+        # Update the session data with the results
+        session_data = get_session_data(session_id)
+        session_data.update(response.context_variables)
+        session_data["pipeline_depth"] = depth
+        # Stages that hit their deadline and returned partial output
+        session_data["degraded_stages"] = degraded_stages()
+        if reason:
+            session_data["profiled"] = reason
+        store_session_data(session_id, session_data)
+
+    # Index the session's evidence for retrieval-based follow-ups
+    index_session(session_id, session_data)
+    return session_data
+
+def continue_claim_pipeline(session_id: str) -> Dict[str, Any]:
+    """Runs the stages a "quick" or "standard" run skipped, so the session
+    ends up with the full report. Blocking; call from a worker thread.
+    """
+    bind_session_id(session_id)
+    session_data = get_session_data(session_id)
+    start_claim_deadline()
+    set_pipeline_depth("full")
+
+    if session_data["pipeline_depth"] == "quick":
+        result = argumentation_handoff(
+            session_data["rephrased_claim"], session_data["analysis"], session_data["research_data"],
+            subclaims=session_data.get("subclaims"),
+        )
+    else:
+        result = objectivity_handoff(
+            session_data["draft_report"], session_data["rephrased_claim"],
+            session_data["analysis"], session_data["research_data"], session_data.get("subclaims"),
+        )
+
+    session_data.update(result.context_variables)
+    session_data["pipeline_depth"] = "full"
+    session_data["degraded_stages"] = session_data.get("degraded_stages", []) + degraded_stages()
+    store_session_data(session_id, session_data)
+    index_session(session_id, session_data)
+    return session_data
+
+def reverify_session(session_id: str) -> Dict[str, Any]:
+    """Incrementally re-checks a watched session. Only questions whose shared
+    search results expired are searched again; the fresh results are diffed
+    against the question's last full search and stored evidence, and
+    analysis onwards is re-run only when at least WATCH_MIN_NEW_EVIDENCE
+    material results appeared. Returns a report of the check, or None if
+    the session no longer exists. Blocking.
+    """
+    bind_session_id(session_id)
+    session_data = get_session_data(session_id)
+    if session_data is None or "research_data" not in session_data:
+        return None
+    research_data = session_data["research_data"]
+
+    expired = [question for question in research_data if search_expired(question)]
+    added = {}
+    for question in expired:
+        # The session keeps only the reranked top results, so diff against the
+        # whole last search (read before searching again overwrites it)
+        previous = research_data[question] + stored_search(question)
+        found = new_evidence(previous, search_tavily(question))
+        if found:
+            added[question] = found
+    report = {
+        "checked_at": time.time(),
+        "searches": len(expired),
+        "new_evidence": sum(len(results) for results in added.values()),
+        "reverified": False,
+    }
+
+    if report["new_evidence"] >= WATCH_MIN_NEW_EVIDENCE:
+        logger.info("Material new evidence, re-running analysis", extra=fields(questions=list(added)))
+        merged = {question: results + added.get(question, []) for question, results in research_data.items()}
+        merged = rerank_results(merged, session_data["rephrased_claim"], RERANK_TOP_K)
+        start_claim_deadline()
+        set_pipeline_depth(session_data.get("pipeline_depth", "full"))
+        result = analyst_handoff(
+            session_data["rephrased_claim"], session_data.get("chain_of_thought", ""), merged,
+            session_data.get("subclaims"),
+        )
+        session_data.update(result.context_variables)
+        session_data["degraded_stages"] = degraded_stages()
+        report["reverified"] = True
+
+    session_data["reverifications"] = (session_data.get("reverifications", []) + [report])[-WATCH_HISTORY:]
+    # Storing also refreshes the TTL of the session's evidence
+    store_session_data(session_id, session_data)
+    if report["reverified"]:
+        index_session(session_id, session_data)
+    return report
+
+def stage_updates(claim: str, context_variables: Dict[str, Any], skip_keys=()) -> List[Dict[str, Any]]:
+    """Builds an agent_update message for every stage whose output is in
+    `context_variables`, skipping stages whose output key is in `skip_keys`.
+    """
+    updates = []
+
+    def add(agent: Agent, key: str, content: str) -> None:
+        if key in context_variables and key not in skip_keys:
+            updates.append({"type": "agent_update", "agent": agent.name, "content": content})
+
+    def bullets(items: List[str]) -> str:
+        return "".join(f"- {item}\n" for item in items)
+
+    add(clarification_agent, "rephrased_claim",
+        f"## Clarification\n\n**Original Claim:** {claim}\n\n**Rephrased Claim:** {context_variables.get('rephrased_claim')}"
+        f"\n\n**Perspectives:**\n{bullets(context_variables.get('perspectives', []))}")
+    add(cognitive_reasoning_agent, "chain_of_thought", f"## Chain of Thought:\n\n{context_variables.get('chain_of_thought')}")
+    add(claim_decomposition_agent, "subclaims", f"## Sub-claims:\n\n{bullets(context_variables.get('subclaims', []))}")
+    add(question_generation_agent, "research_questions",
+        f"## Research Questions:\n\n{bullets(context_variables.get('research_questions', []))}")
+
+    if "research_data" in context_variables and "research_data" not in skip_keys:
+        research_content = get_evidence_artifact(context_variables['research_data']).render()
+        research_stats = context_variables.get('research_stats', {})
+        if research_stats.get('stop_reason', 'completed') != 'completed':
+            research_content = (
+                f"*Research stopped early ({research_stats['stop_reason']}) after "
+                f"{research_stats['searches']} searches.*\n\n{research_content}"
+            )
+        add(research_agent, "research_data", f"## Research Findings:\n\n{research_content}")
+
+    add(analyst_agent, "analysis", f"## Analysis:\n\n{context_variables.get('analysis')}")
+    add(argumentation_mining_agent, "argumentation_analysis",
+        f"## Argumentation Analysis:\n\n{context_variables.get('argumentation_analysis')}")
+    add(drafter_agent, "draft_report", f"## Draft Report:\n\n{context_variables.get('draft_report')}")
+    add(objectivity_agent, "objectivity_feedback",
+        f"## Objectivity Feedback:\n\n{context_variables.get('objectivity_feedback')}")
+    add(visualization_agent, "visualizations", f"## Visualization:\n\n{context_variables.get('visualizations')}")
+    if "timeline" in context_variables and "timeline" not in skip_keys:
+        updates.append({"type": "timeline", "agent": visualization_agent.name, "content": context_variables["timeline"]})
+    add(feedback_agent, "user_feedback", f"## Final Feedback:\n\n{context_variables.get('user_feedback')}")
+    return updates
+
+def early_report(context_variables: Dict[str, Any]) -> str:
+    """The report sent when a run stops before the feedback stage: the draft
+    report at "standard" depth, or the analysis plus key evidence at "quick".
+    """
+    if context_variables["pipeline_depth"] == "standard":
+        return context_variables["draft_report"]
+    key_evidence = get_evidence_artifact(context_variables["research_data"]).render(QUICK_EVIDENCE_TOKENS)
+    return f"## Verdict\n\n{context_variables['analysis']}\n\n## Key Evidence\n\n{key_evidence}"
+
+def run_article_claim(claim: str, session_id: str, depth: str) -> Dict[str, Any]:
+    """Verifies one claim of an article and adds its `verdict`: the final
+    feedback, or the early report for a shortened run.
+    """
+    context_variables = run_claim_pipeline(claim, session_id, depth)
+    context_variables["verdict"] = (
+        context_variables.get("user_feedback") if depth == "full" else early_report(context_variables)
+    )
+    return context_variables
+
+def store_article_session(session_id: str, text: str, records: List[Dict[str, Any]], report: str) -> None:
+    """Stores an article run as one session whose evidence is the pooled
+    evidence of its claims, so follow-up questions can draw on all of them.
+    """
+    research_data = {}
+    for record in records:
+        claim_data = get_session_data(record["session_id"]) if record["status"] == "ok" else None
+        research_data.update((claim_data or {}).get("research_data", {}))
+    session_data = {
+        "session_id": session_id,
+        "claim": text,
+        "mode": "article",
+        "claims": records,
+        "research_data": research_data,
+        "analysis": "\n\n".join(f"{r['claim']}\n{r.get('verdict') or ''}" for r in records),
+        "draft_report": report,
+        "user_feedback": report,
+    }
+    store_session_data(session_id, session_data)
+    clear_followup_memory(redis_client, session_id)
+    index_session(session_id, session_data)
+
+async def verify_article(channel: MessageChannel, text: str, session_id: str, depth: str) -> None:
+    """Article mode: extracts the check-worthy claims of a long text,
+    verifies them concurrently (sharing the search/LLM caches and the
+    evidence store) and streams each claim's verdict as it finishes,
+    followed by an aggregate report.
+    """
+    await channel.send_json({"type": "thinking", "content": "Extracting claims from the article..."})
+    claims = await asyncio.to_thread(extract_claims, text)
+    if not claims:
+        await channel.send_json({"type": "error", "content": "No check-worthy claims found in the text."})
+        return
+    claim_list = "<br>".join(f"{i + 1}. {claim}" for i, claim in enumerate(claims))
+    await channel.send_json({"type": "bot-output", "content": f"Checking {len(claims)} claims:<br>{claim_list}"})
+
+    items = [{"id": str(i + 1), "claim": claim} for i, claim in enumerate(claims)]
+    results = run_batch(
+        items, lambda claim, claim_session_id: run_article_claim(claim, claim_session_id, depth),
+        ARTICLE_WORKERS, result_fields=["rephrased_claim", "verdict", "degraded_stages"],
+    )
+    records = []
+    # Pull results from the worker pool without blocking the event loop
+    while (record := await asyncio.to_thread(next, results, None)) is not None:
+        records.append(record)
+        await channel.send_json({"type": "claim_result", "done": len(records), "total": len(items), **record})
+
+    records.sort(key=lambda record: int(record["id"]))
+    report = await asyncio.to_thread(aggregate_report, records)
+    await asyncio.to_thread(store_article_session, session_id, text, records, report)
+    await channel.send_json({"type": "final_report", "content": report, "claims": len(records)})
+    log_wire_stats(channel)
+
+def log_wire_stats(channel: MessageChannel) -> None:
+    """Logs the bytes sent for the claim that just finished on a socket."""
+    logger.info("Claim bytes on wire", extra=fields(**channel.finish_claim()))
+
+async def push_remaining_stages(channel: MessageChannel, claim: str, session_id: str, sent_keys) -> None:
+    """Finishes a shortened run in the background and pushes the remaining
+    stage cards and the final report when they are ready.
+    """
+    try:
+        session_data = await asyncio.to_thread(continue_claim_pipeline, session_id)
+        for update in stage_updates(claim, session_data, skip_keys=sent_keys):
+            await channel.send_json(update)
+        await channel.send_json({
+            "type": "final_report",
+            "content": session_data.get('user_feedback', 'No feedback generated.')
+        })
+        log_wire_stats(channel)
+    except Exception as e:
+        logger.error(f"Background stages failed for session ID {session_id}: {e}")
+
 # -------------------------------------------------
 
 # ---------- WebSocket Endpoint ----------
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    global active_websocket # Declare the global variable
-    active_websocket = websocket  # Store the WebSocket
     await websocket.accept()
+    bind_session_id(session_id)
+    # Send stage payloads as msgpack to clients that ask for it (?encoding=msgpack)
+    channel = MessageChannel(websocket, websocket.query_params.get("encoding", "json"), session_id)
+    # Route agent updates from the pipeline thread back to this socket
+    bind_websocket(channel, asyncio.get_running_loop())
     logger.info(f"WebSocket connection established for session ID: {session_id}")
+    # Admins can profile every claim on a socket with X-Admin-Token plus X-Profile: 1
+    profile_socket = is_admin(websocket.headers.get("x-admin-token")) and websocket.headers.get("x-profile") == "1"
+    # Background completions of "quick"/"standard" runs on this socket
+    background_tasks = set()
+    # Deliver this session's relayed messages, from any worker, to this socket;
+    # a reconnecting client passes ?since=<last seq> to get what it missed
+    forwarder = None
+    if relay_enabled():
+        since = websocket.query_params.get("since")
+        # Subscribed before the first message is read, so no update is missed
+        pubsub = await subscribe(session_id)
+        forwarder = asyncio.create_task(
+            forward(pubsub, session_id, channel.deliver, int(since) if since and since.isdigit() else None)
+        )
 
     try:
         while True:
@@ -123,164 +442,226 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
 
             if message["type"] == "new_question":
                 claim = message["content"]
-
-                # Store initial claim in session data
-                initial_data = {"claim": claim}
-                store_session_data(session_id, initial_data)
-                print("Starting Swarm workflow...")
+                try:
+                    depth = validate_depth(message.get("depth", PIPELINE_DEPTH))
+                except ValueError as e:
+                    await channel.send_json({"type": "error", "content": str(e)})
+                    continue
+
+                # Let the previous claim's background stages finish first, so
+                # they neither overwrite this claim's session nor mix into its stream
+                if background_tasks:
+                    await channel.send_json({"type": "thinking", "content": "Finishing the previous report..."})
+                    await asyncio.gather(*background_tasks)
+
+                # Long texts are split into claims and checked concurrently
+                if is_article(claim, message.get("mode")):
+                    logger.info("Starting article mode", extra=fields(depth=depth, chars=len(claim)))
+                    await verify_article(channel, claim, session_id, depth)
+                    continue
+                logger.info("Starting Swarm workflow", extra=fields(depth=depth, claim=claim))
 
                 # Initiate the Swarm workflow
-                await websocket.send_json({"type": "thinking", "content": "Analyzing..."})
-
-                # Use await to run the Swarm workflow asynchronously 
-                response = swarm_client.run(  
-                    agent=misinformation_agent,
-                    messages=[{"role": "user", "content": claim}],
-                    context_variables={"session_id": session_id},
-                )
-
-                print("Swarm response:", response)
-
-                # --- Send agent_update messages for each agent ---
-
-                # Clarification Agent
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": clarification_agent.name,
-                    "content": f"## Clarification\n\n**Original Claim:** {claim}\n\n**Rephrased Claim:** {response.context_variables['rephrased_claim']}\n\n**Perspectives:**\n{''.join(['- ' + p + '\\n' for p in response.context_variables['perspectives']])}"
-                })
-
-                # Cognitive Reasoning Agent
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": cognitive_reasoning_agent.name,
-                    "content": f"## Chain of Thought:\n\n{response.context_variables['chain_of_thought']}"
-                })
-
-                # Claim Decomposition Agent
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": claim_decomposition_agent.name,
-                    "content": f"## Sub-claims:\n\n{''.join(['- ' + sc + '\\n' for sc in response.context_variables['subclaims']])}"
-                })
-
-                # Question Generation Agent
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": question_generation_agent.name,
-                    "content": f"## Research Questions:\n\n{''.join(['- ' + q + '\\n' for q in response.context_variables['research_questions']])}" 
-                })
-
-                # Research Agent
-                research_content = ""
-                for question, results in response.context_variables['research_data'].items():
-                    research_content += f"### {question}\n\n"
-                    for i, result in enumerate(results):
-                        source = result.get("source", "Unknown Source")
-                        title = result.get("title", "No Title")
-                        url = result.get("url", "No URL")
-                        snippet = result.get("snippet", "")
-                        research_content += (
-                            f"**Result {i+1} ({source}):**\n"
-                            f"   - **Title:** {title}\n"
-                            f"   - **URL:** {url}\n"
-                            f"   - **Snippet:** {snippet}\n\n"
-                        )
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": research_agent.name,
-                    "content": f"## Research Findings:\n\n{research_content}" 
-                })
-
-                # Analyst Agent
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": analyst_agent.name,
-                    "content": f"## Analysis:\n\n{response.context_variables['analysis']}"
-                })
-
-                # Argumentation Mining Agent 
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": argumentation_mining_agent.name,
-                    "content": f"## Argumentation Analysis:\n\n{response.context_variables['argumentation_analysis']}"
-                })
-
-                # Drafter Agent 
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": drafter_agent.name,
-                    "content": f"## Draft Report:\n\n{response.context_variables['draft_report']}"
-                })
-
-                # Objectivity Agent
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": objectivity_agent.name,
-                    "content": f"## Objectivity Feedback:\n\n{response.context_variables['objectivity_feedback']}"
-                })
-
-                # Visualization Agent
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": visualization_agent.name,
-                    "content": response.context_variables['visualizations']
-                })
-
-                # Feedback Agent
-                await websocket.send_json({
-                    "type": "agent_update",
-                    "agent": feedback_agent.name,
-                    "content": f"## Final Feedback:\n\n{response.context_variables['user_feedback']}"
-                })
-
-                # Update the session data with the results
-                session_data = get_session_data(session_id)
-                session_data.update(response.context_variables)
-                store_session_data(session_id, session_data)
+                await channel.send_json({"type": "thinking", "content": "Analyzing..."})
+
+                # Run the blocking Swarm workflow in a worker thread
+                profile = profile_socket or bool(message.get("profile"))
+                context_variables = await asyncio.to_thread(run_claim_pipeline, claim, session_id, depth, profile)
+
+                logger.debug("Swarm response", extra=fields(sample=True, context_variables=context_variables))
 
-                # Send back the final user_feedback
-                await websocket.send_json({
-                    "type": "final_report", 
-                    "content": response.context_variables.get('user_feedback', 'No feedback generated.')
-                })
+                # --- Send agent_update messages for each agent that ran ---
+                for update in stage_updates(claim, context_variables):
+                    await channel.send_json(update)
+
+                if depth == "full":
+                    # Send back the final user_feedback
+                    await channel.send_json({
+                        "type": "final_report", 
+                        "content": context_variables.get('user_feedback', 'No feedback generated.')
+                    })
+                    log_wire_stats(channel)
+                else:
+                    # Send the verdict now and, unless declined, finish the report in the background
+                    await channel.send_json({
+                        "type": "final_report",
+                        "content": early_report(context_variables),
+                        "depth": depth,
+                    })
+                    if message.get("continue", True):
+                        await channel.send_json({"type": "thinking", "content": "Completing the full report..."})
+                        task = asyncio.create_task(
+                            push_remaining_stages(channel, claim, session_id, set(context_variables))
+                        )
+                        background_tasks.add(task)
+                        task.add_done_callback(background_tasks.discard)
+                    else:
+                        log_wire_stats(channel)
 
             elif message["type"] == "followup":
                 followup_question = message["content"]
                 session_data = get_session_data(session_id)
 
                 if session_data:
-                    await websocket.send_json({"type": "thinking", "content": "Thinking..."})
-                    followup_answer = answer_followup(followup_question, session_data, websocket)
-                    await websocket.send_json({"type": "followup_response", "content": followup_answer})
+                    await channel.send_json({"type": "thinking", "content": "Thinking..."})
+                    memory = load_followup_memory(redis_client, session_id)
+                    followup_answer = await asyncio.to_thread(answer_followup, followup_question, session_data, memory)
+                    await channel.send_json({"type": "followup_response", "content": followup_answer})
+
+                    # Record the turn, compacting older turns once over budget
+                    memory = await asyncio.to_thread(add_followup_turn, memory, followup_question, followup_answer)
+                    save_followup_memory(redis_client, session_id, memory)
                 else:
-                    await websocket.send_json({"type": "error", "content": "No existing session found."})
+                    await channel.send_json({"type": "error", "content": "No existing session found."})
 
             else:
                 logger.warning("Invalid message type received: %s", message["type"])
 
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        await websocket.send_json({"type": "error", "content": f"An error occurred: {str(e)}"})
+        await channel.send_json({"type": "error", "content": f"An error occurred: {str(e)}"})
 
     finally:
+        # The pipeline threads still finish and store the full report
+        for task in list(background_tasks):
+            task.cancel()
+        if forwarder is not None:
+            forwarder.cancel()
         await websocket.close()
         logger.info(f"WebSocket connection closed for session ID: {session_id}")
 
 # -------------------------------------------------
 
+# ---------- Batch Endpoint ----------
+class BatchRequest(BaseModel):
+    claims: List[str]
+    workers: int = BATCH_WORKERS
+
+@app.post("/claims/batch")
+async def verify_claims_batch(request: BatchRequest):
+    """Verifies many claims in parallel, streaming one JSON line per claim as
+    it completes, followed by a final line with throughput and failure stats.
+    The worker count is capped at BATCH_WORKERS_MAX.
+    """
+    if request.workers < 1:
+        raise HTTPException(status_code=422, detail="workers must be at least 1.")
+    workers = min(request.workers, BATCH_WORKERS_MAX)
+    claims = [{"id": str(i + 1), "claim": claim} for i, claim in enumerate(request.claims)]
+
+    def stream_results():
+        stats = BatchStats()
+        for record in run_batch(claims, run_claim_pipeline, workers, stats):
+            yield json.dumps(record) + "\n"
+        yield json.dumps({"type": "stats", **stats.summary()}) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+# -------------------------------------------------
+
+# ---------- Watchlist Endpoints ----------
+class WatchRequest(BaseModel):
+    session_id: str
+    interval_hours: float = WATCH_INTERVAL_HOURS
+
+@app.post("/watchlist")
+async def add_to_watchlist(request: WatchRequest):
+    """Schedules a verified claim for periodic re-verification (run by
+    `python watchlist.py run`).
+    """
+    if not request.interval_hours >= WATCH_MIN_INTERVAL_HOURS:
+        raise HTTPException(status_code=422, detail=f"interval_hours must be at least {WATCH_MIN_INTERVAL_HOURS}.")
+    session_data = get_session_data(request.session_id)
+    if session_data is None:
+        raise HTTPException(status_code=404, detail="No existing session found.")
+    return watch(redis_client, request.session_id, session_data["claim"], request.interval_hours)
+
+@app.get("/watchlist")
+async def get_watchlist(request: Request):
+    """Returns the watched claims with their next check and last report.
+    Admin only, since session ids give access to their sessions.
+    """
+    require_admin(request)
+    return list_watched(redis_client)
+
+@app.delete("/watchlist/{session_id}")
+async def remove_from_watchlist(session_id: str):
+    if not unwatch(redis_client, session_id):
+        raise HTTPException(status_code=404, detail="Session is not watched.")
+    return {"session_id": session_id, "watched": False}
+
+# -------------------------------------------------
+
+# ---------- Admin Endpoints ----------
+def require_admin(request: Request) -> None:
+    if not is_admin(request.headers.get("x-admin-token")):
+        raise HTTPException(status_code=403, detail="Admin token required.")
+
+@app.get("/admin/profiles")
+async def get_profiles(request: Request, limit: int = 50):
+    """Lists the most recent profiled runs."""
+    require_admin(request)
+    return list_profiles(limit)
+
+@app.get("/admin/profiles/{session_id}")
+async def get_profile(request: Request, session_id: str):
+    """Returns a run's wall/CPU times, outbound call timings and hottest functions."""
+    require_admin(request)
+    profile = load_profile(session_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No profile for this session.")
+    return profile
+
+@app.get("/admin/profiles/{session_id}/pstats")
+async def get_profile_pstats(request: Request, session_id: str):
+    """Downloads the raw cProfile stats (for pstats, snakeviz and the like)."""
+    require_admin(request)
+    data = load_pstats(session_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="No CPU profile for this session.")
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f'attachment; filename="{session_id}.prof"'},
+    )
+
+# -------------------------------------------------
+
+# ---------- Metrics Endpoint ----------
+@app.get("/metrics/routes")
+async def get_route_metrics():
+    """Returns the model routing table and per-route latency and token usage, over all workers."""
+    return {"routes": MODEL_ROUTES, "metrics": cluster_summary("routes")}
+
+@app.get("/metrics/wire")
+async def get_wire_metrics():
+    """Returns WebSocket bytes sent per claim, before and after deflate, over all workers."""
+    return cluster_summary("wire")
+
+@app.get("/metrics/structured")
+async def get_structured_metrics():
+    """Returns per-stage structured-output retries and discarded list items, over all workers."""
+    return cluster_summary("structured")
+
+@app.get("/metrics/breakers")
+async def get_breaker_metrics():
+    """Returns this worker's search and LLM circuit breaker states and counts."""
+    return {"worker": WORKER_ID, "search": search_breaker.summary(), "llm": llm_breaker.summary()}
+
+# -------------------------------------------------
+
 # --------  HTML Endpoints  --------
 @app.get("/", response_class=HTMLResponse)
-async def read_homepage():
-    with open("templates/homepage.html", "r", encoding="utf-8") as f:
-        html_content = f.read()
-    return HTMLResponse(content=html_content, status_code=200)
+async def read_homepage(request: Request):
+    return templates.response(request, "homepage.html")
 
 @app.get("/dashboard", response_class=HTMLResponse)
-async def read_dashboard():
-    with open("templates/index.html", "r") as f: # Serve from "templates" folder
-        html_content = f.read()
-    return html_content
+async def read_dashboard(request: Request):
+    return templates.response(request, "index.html") # Serve from "templates" folder
+
+@app.get("/static/{name:path}")
+async def read_static(request: Request, name: str):
+    """Serves static files; fingerprinted names are cached as immutable."""
+    return static_assets.response(request, name)
 
 
 
@@ -288,4 +669,12 @@ async def read_dashboard():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
\ No newline at end of file
+    # Workers need the app as an import string; sessions need no affinity
+    uvicorn.run(
+        "main:app" if WEB_WORKERS > 1 else app,
+        host=os.getenv("WEB_HOST", "0.0.0.0"),
+        port=int(os.getenv("WEB_PORT", 8000)),
+        workers=WEB_WORKERS,
+        log_level="info",
+        ws_per_message_deflate=WS_PER_MESSAGE_DEFLATE,
+    )
\ No newline at end of file
@@ -35,15 +35,25 @@ document.addEventListener('DOMContentLoaded', () => {
 
         // Initialize WebSocket connection
         initWebSocket() {
-            this.ws = new WebSocket(`ws://${window.location.hostname}:8000/ws/${this.sessionId}`);
+            // Ask for compact msgpack frames when the decoder is available
+            const encoding = window.MessagePack ? 'msgpack' : 'json';
+            // After a reconnect, ask for the relayed messages missed meanwhile
+            const since = this.lastSeq ? `&since=${this.lastSeq}` : '';
+            this.ws = new WebSocket(`ws://${window.location.hostname}:8000/ws/${this.sessionId}?encoding=${encoding}${since}`);
+            this.ws.binaryType = 'arraybuffer';
             this.ws.onopen = () => console.log('WebSocket connection opened');
             this.ws.onmessage = (event) => this.handleMessage(event);
-            this.ws.onclose = () => console.log('WebSocket connection closed');
+            this.ws.onclose = () => {
+                console.log('WebSocket connection closed');
+                // Any worker can take the session over, so just reconnect
+                setTimeout(() => this.initWebSocket(), 1000);
+            };
         }
 
         // Cache frequently accessed DOM elements
         cacheDOMElements() {
             this.terminal = document.getElementById('terminal');
+            this.depthSelect = document.getElementById('depth-select');
             this.reports = document.getElementById('reports');
             this.inputField = document.getElementById('input-field');
             this.sendButton = document.getElementById('send-button');
@@ -89,7 +99,12 @@ document.addEventListener('DOMContentLoaded', () => {
 
         // Handle incoming WebSocket messages
         handleMessage(event) {
-            const messageData = JSON.parse(event.data);
+            // Binary frames are msgpack, text frames are JSON
+            const messageData = event.data instanceof ArrayBuffer
+                ? window.MessagePack.decode(new Uint8Array(event.data))
+                : JSON.parse(event.data);
+            // Relayed messages are numbered per session
+            if (messageData.seq) this.lastSeq = messageData.seq;
 
             switch (messageData.type) {
                 case 'thinking':
@@ -101,6 +116,14 @@ document.addEventListener('DOMContentLoaded', () => {
                 case 'agent_update':
                     this.updateAgentCard(messageData.agent, messageData.content);
                     break;
+                case 'timeline':
+                    // Rendered by the static renderer in timeline.js
+                    window.renderTimeline('#timeline-container', messageData.content);
+                    break;
+                case 'claim_result':
+                    // Article mode: one verdict per extracted claim, in finishing order
+                    this.appendToTerminal(this.formatClaimResult(messageData), 'bot-output');
+                    break;
                 case 'final_report':
                     this.displayFinalReport(messageData.content);
                     break;
@@ -139,13 +162,21 @@ document.addEventListener('DOMContentLoaded', () => {
             this.terminal.scrollTop = this.terminal.scrollHeight;
         }
 
+        // Format an article-mode claim verdict for the terminal
+        formatClaimResult(result) {
+            const heading = `**Claim ${result.id}** (${result.done}/${result.total} checked): ${result.claim}`;
+            const verdict = result.status === 'ok' ? result.verdict : `Could not be verified: ${result.error}`;
+            return marked.parse(`${heading}\n\n${verdict || ''}`);
+        }
+
         // Send user message to the server
         sendMessage() {
             const message = this.inputField.value.trim();
             if (message !== '') {
                 this.appendToTerminal(message, 'user-input');
                 this.inputField.value = '';
-                this.ws.send(JSON.stringify({ type: 'new_question', content: message }));
+                const depth = this.depthSelect ? this.depthSelect.value : 'full';
+                this.ws.send(JSON.stringify({ type: 'new_question', content: message, depth: depth }));
             }
         }
 
@@ -167,11 +198,6 @@ document.addEventListener('DOMContentLoaded', () => {
 
                 // Apply quantum ripple effect using GSAP
                 gsap.fromTo(contentContainer, { opacity: 0 }, { opacity: 1, duration: 0.5 });
-
-                // If the Visualization Agent, render the timeline
-                if (agentName === 'Visualization Agent') {
-                    this.renderTimeline(agentData);
-                }
             }
         }
 
@@ -244,113 +270,6 @@ document.addEventListener('DOMContentLoaded', () => {
             this.followupChat.appendChild(line);
             this.followupChat.scrollTop = this.followupChat.scrollHeight;
         }
-
-        // Render the timeline visualization using D3.js
-        renderTimeline(agentData) {
-            // Extract timeline data from agentData
-            const timelineData = this.extractTimelineData(agentData);
-            if (!timelineData) return;
-
-            // Remove any existing SVG
-            d3.select('#timeline-container').selectAll('*').remove();
-
-            const margin = { top: 20, right: 20, bottom: 30, left: 50 };
-            const width = document.getElementById('timeline-container').offsetWidth - margin.left - margin.right;
-            const height = 300 - margin.top - margin.bottom;
-
-            const svg = d3.select('#timeline-container')
-                .append('svg')
-                .attr('width', width + margin.left + margin.right)
-                .attr('height', height + margin.top + margin.bottom)
-                .append('g')
-                .attr('transform', `translate(${margin.left},${margin.top})`);
-
-            // Parse dates and set up scales
-            const parseDate = d3.timeParse('%Y-%m-%d');
-            timelineData.forEach(d => {
-                d.date = parseDate(d.date) || new Date();
-            });
-
-            const xScale = d3.scaleTime()
-                .domain(d3.extent(timelineData, d => d.date))
-                .range([0, width]);
-
-            const yScale = d3.scaleLinear()
-                .domain([0, 1])
-                .range([height / 2, height / 2]); // Fixed y position
-
-            // Add timeline line
-            svg.append('line')
-                .attr('class', 'timeline-line')
-                .attr('x1', 0)
-                .attr('y1', height / 2)
-                .attr('x2', width)
-                .attr('y2', height / 2);
-
-            // Add circles for events
-            svg.selectAll('circle')
-                .data(timelineData)
-                .enter()
-                .append('circle')
-                .attr('class', 'timeline-circle')
-                .attr('cx', d => xScale(d.date))
-                .attr('cy', height / 2)
-                .attr('r', 6)
-                .attr('fill', d => this.getEventColor(d.type))
-                .on('mouseover', (event, d) => this.showTooltip(event, d.title))
-                .on('mouseout', () => this.hideTooltip());
-
-            // Add X-axis
-            svg.append('g')
-                .attr('transform', `translate(0,${height})`)
-                .call(d3.axisBottom(xScale));
-
-            // Initialize tooltip
-            this.tooltip = d3.select('body').append('div')
-                .attr('class', 'tooltip')
-                .style('opacity', 0);
-        }
-
-        // Extract timeline data from agentData content
-        extractTimelineData(content) {
-            // Assume the content is JSON with an 'events' array
-            try {
-                const data = JSON.parse(content);
-                return data.events || null;
-            } catch (error) {
-                console.error('Error parsing timeline data:', error);
-                return null;
-            }
-        }
-
-        // Get color based on event type
-        getEventColor(type) {
-            switch (type) {
-                case 'claim': return '#00ff41';
-                case 'subclaim': return '#1e90ff';
-                case 'question': return '#ffae00';
-                case 'result': return '#ff4500';
-                case 'analysis': return '#ff1493';
-                default: return '#cccccc';
-            }
-        }
-
-        // Show tooltip on hover
-        showTooltip(event, text) {
-            this.tooltip.transition()
-                .duration(200)
-                .style('opacity', .9);
-            this.tooltip.html(text)
-                .style('left', (event.pageX + 10) + 'px')
-                .style('top', (event.pageY - 28) + 'px');
-        }
-
-        // Hide tooltip
-        hideTooltip() {
-            this.tooltip.transition()
-                .duration(500)
-                .style('opacity', 0);
-        }
     }
 
     // Instantiate the bot
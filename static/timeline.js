@@ -0,0 +1,93 @@
+// timeline.js
+
+// Renders the compact timeline sent in `timeline` messages:
+// { generated: 'YYYY-MM-DD', events: [{ type, title, date, source, url, question }] }
+// Dates are ISO strings (null for undated sources), already sorted by the server.
+(function () {
+    const EVENT_TYPES = ['claim', 'subclaim', 'question', 'result', 'analysis'];
+    const EVENT_COLORS = {
+        claim: '#00ff41',
+        subclaim: '#1e90ff',
+        question: '#ffae00',
+        result: '#ff4500',
+        analysis: '#ff1493',
+    };
+
+    let tooltip = null;
+
+    function getTooltip() {
+        if (!tooltip) {
+            tooltip = d3.select('body').append('div')
+                .attr('class', 'tooltip')
+                .style('opacity', 0);
+        }
+        return tooltip;
+    }
+
+    function renderTimeline(container, timeline) {
+        const events = (timeline && timeline.events) || [];
+        const root = d3.select(container);
+        root.selectAll('*').remove();
+        if (!events.length) return;
+
+        // Undated sources are placed at the generation date
+        const parseDate = d3.timeParse('%Y-%m-%d');
+        const fallbackDate = parseDate(timeline.generated) || new Date();
+        const points = events.map(e => ({ ...e, parsedDate: (e.date && parseDate(e.date)) || fallbackDate }));
+
+        const margin = { top: 20, right: 20, bottom: 30, left: 80 };
+        const width = root.node().offsetWidth - margin.left - margin.right;
+        const height = 300 - margin.top - margin.bottom;
+
+        const svg = root.append('svg')
+            .attr('width', width + margin.left + margin.right)
+            .attr('height', height + margin.top + margin.bottom)
+            .append('g')
+            .attr('transform', `translate(${margin.left},${margin.top})`);
+
+        const xScale = d3.scaleTime()
+            .domain(d3.extent(points, d => d.parsedDate))
+            .range([0, width])
+            .nice();
+        const yScale = d3.scaleBand()
+            .domain(EVENT_TYPES)
+            .range([0, height])
+            .padding(1);
+
+        svg.append('g')
+            .attr('transform', `translate(0,${height})`)
+            .call(d3.axisBottom(xScale));
+        svg.append('g')
+            .call(d3.axisLeft(yScale));
+
+        const tip = getTooltip();
+        svg.selectAll('circle')
+            .data(points)
+            .enter()
+            .append('circle')
+            .attr('class', 'timeline-circle')
+            .attr('cx', d => xScale(d.parsedDate))
+            .attr('cy', d => yScale(d.type) + yScale.bandwidth() / 2)
+            .attr('r', 6)
+            .attr('fill', d => EVENT_COLORS[d.type] || '#cccccc')
+            .on('mouseover', (event, d) => {
+                // Titles, sources and URLs come from web pages: set them as text only
+                tip.html('');
+                tip.append('strong').text(d.title);
+                tip.append('div').text(`Date: ${d.date || 'Unknown'}`);
+                tip.append('div').text(`Source: ${d.source}`);
+                if (/^https?:\/\//i.test(d.url || '')) {
+                    tip.append('a').attr('href', d.url).attr('target', '_blank').attr('rel', 'noopener noreferrer').text(d.url);
+                }
+                tip.style('left', (event.pageX + 10) + 'px')
+                    .style('top', (event.pageY - 28) + 'px');
+                tip.transition().duration(200).style('opacity', .9);
+            })
+            .on('mouseout', () => tip.transition().duration(500).style('opacity', 0))
+            .on('click', (event, d) => {
+                if (/^https?:\/\//i.test(d.url || '')) window.open(d.url, '_blank', 'noopener');
+            });
+    }
+
+    window.renderTimeline = renderTimeline;
+})();
@@ -0,0 +1,81 @@
+import json
+from types import SimpleNamespace
+
+# One reply that every stage accepts: the structured stages read their list
+# from it, the free-text stages just use it as text
+REPLY = json.dumps({
+    "perspectives": ["Official statistics", "Independent audits"],
+    "subclaims": ["Unemployment fell in 2023."],
+    "questions": ["What was the unemployment rate in 2023?"],
+})
+
+
+class StubCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content=REPLY)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class StubClient:
+    def __init__(self, completions):
+        self.chat = SimpleNamespace(completions=completions)
+        self.options = []
+
+    def with_options(self, **options):
+        self.options.append(options)
+        return self
+
+
+class StubTavily:
+    def __init__(self):
+        self.queries = []
+
+    def search(self, query, **kwargs):
+        self.queries.append(query)
+        return {"results": [{
+            "title": f"Result for {query[:40]}",
+            "url": f"https://www.bls.gov/{len(self.queries)}",
+            "content": f"Evidence about {query}",
+            "score": 0.9,
+        }]}
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the Redis commands the evidence store uses."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
@@ -0,0 +1,34 @@
+import pytest
+
+from utils.breaker import CircuitBreaker, CircuitOpenError
+
+
+def fail():
+    raise ConnectionError("upstream is down")
+
+
+def test_late_success_does_not_close_an_open_breaker():
+    breaker = CircuitBreaker("test", slow_seconds=10, failures=2)
+
+    def slow_call():
+        # Other calls fail and open the breaker while this one is in flight
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                breaker.call(fail)
+        assert breaker.state == "open"
+        return "ok"
+
+    assert breaker.call(slow_call) == "ok"
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+
+
+def test_probe_success_closes_the_breaker(monkeypatch):
+    breaker = CircuitBreaker("test", slow_seconds=10, failures=1)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    monkeypatch.setattr(breaker, "_cooldown", 0)
+
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == "closed"
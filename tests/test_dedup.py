@@ -0,0 +1,23 @@
+from utils.dedup import clean_question, deduplicate_questions
+
+
+def test_keeps_questions():
+    assert clean_question("1. **What did the CDC report in 2020?**") == "What did the CDC report in 2020?"
+    assert clean_question("Is the unemployment rate falling") == "Is the unemployment rate falling"
+
+
+def test_drops_declarative_lines():
+    assert clean_question("In 2020 the CDC said X.") is None
+    assert clean_question("To be honest, yes.") is None
+    assert clean_question("Here are the research questions:") is None
+
+
+def test_collapses_near_duplicates():
+    questions = [
+        "What did the CDC report about flu deaths in 2020?",
+        "What did the CDC report in 2020 about flu deaths?",
+        "How many people voted in the 2020 election?",
+    ]
+    kept, dropped = deduplicate_questions(questions)
+    assert kept == [questions[0], questions[2]]
+    assert dropped == 1
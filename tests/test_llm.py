@@ -0,0 +1,17 @@
+import pytest
+
+pytest.importorskip("openai")
+
+import utils.llm as llm
+from utils.cache import llm_cache
+from tests.stubs import StubClient, StubCompletions
+
+
+def test_calls_are_bounded_by_the_stage_deadline(monkeypatch):
+    client = StubClient(StubCompletions())
+    monkeypatch.setattr(llm, "openai_client", client)
+    monkeypatch.setattr(llm_cache.local, "_data", type(llm_cache.local._data)())
+    monkeypatch.setitem(llm.LLM_STAGE_DEADLINES, "timeout_test", 12)
+
+    llm.chat_completion([{"role": "user", "content": "hi"}], stage="timeout_test")
+    assert client.options == [{"timeout": 12, "max_retries": 0}]
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+pytest.importorskip("swarm")
+pytest.importorskip("openai")
+pytest.importorskip("tavily")
+
+import utils.llm as llm
+import agents.research_agent as research_agent
+from agents.clarification_agent import clarification_handoff
+from utils.cache import llm_cache, search_cache
+from utils.depth import set_pipeline_depth
+from tests.stubs import REPLY, StubClient, StubCompletions, StubTavily
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    completions = StubCompletions()
+    tavily = StubTavily()
+    monkeypatch.setattr(llm, "openai_client", StubClient(completions))
+    monkeypatch.setattr(research_agent, "tavily_client", tavily)
+    monkeypatch.setattr(research_agent, "PREFETCH_ENABLED", True)
+    monkeypatch.setattr(llm_cache.local, "_data", type(llm_cache.local._data)())
+    monkeypatch.setattr(search_cache, "_data", type(search_cache._data)())
+    set_pipeline_depth("quick")
+    return completions, tavily
+
+
+def test_result_keeps_prefetched_evidence(stubs):
+    completions, tavily = stubs
+    result = clarification_handoff("Unemployment fell last year.")
+
+    context = result.context_variables
+    assert context["research_stats"]["prefetched"] > 0
+    # The rephrased claim is the first prefetched query
+    assert REPLY in context["research_data"]
+    assert context["research_data"][REPLY]
+    # Every query is searched once, by the prefetch or by research
+    assert len(tavily.queries) == len(set(tavily.queries))
+
+
+def test_stats_count_only_research_searches(stubs):
+    completions, tavily = stubs
+    result = clarification_handoff("Unemployment fell last year.")
+
+    stats = result.context_variables["research_stats"]
+    research_questions = json.loads(REPLY)["questions"]
+    # Prefetched queries were searched before research started
+    assert stats["searches"] == len(tavily.queries) - stats["prefetched"]
+    assert stats["searches"] <= len(research_questions)
+    assert stats["skipped_questions"] == 0
@@ -0,0 +1,24 @@
+from utils.records import EvidenceRecord
+from utils.retrieval import get_session_index, index_session
+
+
+def session(analysis):
+    return {
+        "research_data": {"What was the unemployment rate in 2023?": [
+            EvidenceRecord(title="Labor report", url="https://www.bls.gov/1", snippet="Unemployment was 3.6%."),
+        ]},
+        "analysis": analysis,
+    }
+
+
+def test_index_is_reused_for_the_same_run():
+    data = session("The claim is mostly true.")
+    index = index_session("retrieval-same", data)
+    assert get_session_index("retrieval-same", session("The claim is mostly true.")) is index
+
+
+def test_index_is_rebuilt_after_a_rerun_elsewhere():
+    index_session("retrieval-rerun", session("The claim is mostly true."))
+    # Another process re-ran the session and stored a new analysis
+    index = get_session_index("retrieval-rerun", session("New evidence shows the claim is false."))
+    assert index.search("false")
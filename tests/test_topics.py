@@ -0,0 +1,18 @@
+from utils.topics import TopicClassifier, TOPIC_KEYWORDS, stem
+
+
+def test_short_plurals_share_a_stem():
+    assert stem("jobs") == stem("job") == "job"
+    assert stem("laws") == stem("law")
+    assert stem("cars") == stem("car")
+
+
+def test_short_words_ending_in_s_are_kept():
+    assert stem("gas") == "gas"
+    assert stem("this") == "this"
+    assert stem("boss") == "boss"
+
+
+def test_short_plural_routes_to_its_topic():
+    classifier = TopicClassifier(TOPIC_KEYWORDS)
+    assert "labor" in classifier.classify("How many jobs were added last month?")
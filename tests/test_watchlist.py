@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("swarm")
+pytest.importorskip("openai")
+pytest.importorskip("tavily")
+
+import agents.research_agent as research_agent
+import utils.evidence_store as evidence_store
+from agents.research_agent import search_expired, search_tavily, stored_search
+from utils.cache import search_cache
+from utils.rerank import rerank_results
+from watchlist import new_evidence
+from tests.stubs import FakeRedis
+
+QUESTION = "What was the unemployment rate in 2023?"
+
+
+class FixedTavily:
+    """Returns the same five results for every search."""
+
+    def search(self, query, **kwargs):
+        return {"results": [{
+            "title": f"Unemployment report {i}",
+            "url": f"https://www.bls.gov/report/{i}",
+            "content": f"The unemployment rate in 2023 was {3 + i / 10}%.",
+            "score": 0.9,
+        } for i in range(5)]}
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(evidence_store, "_redis_client", redis)
+    monkeypatch.setattr(research_agent, "tavily_client", FixedTavily())
+    monkeypatch.setattr(search_cache, "_data", type(search_cache._data)())
+    return redis
+
+
+def expire_searches(redis):
+    """Drops the shared search results as SEARCH_CACHE_TTL would, keeping
+    the stale copies and the evidence.
+    """
+    for key in list(redis.data):
+        if key.startswith("evidence:search:") and not key.startswith("evidence:search:stale:"):
+            del redis.data[key]
+    search_cache._data.clear()
+
+
+def test_same_search_has_no_new_evidence(redis):
+    # The session keeps only the reranked top results of the first search
+    kept = rerank_results({QUESTION: search_tavily(QUESTION)}, "Unemployment fell in 2023.", 3)[QUESTION]
+    assert len(kept) == 3
+
+    expire_searches(redis)
+    assert search_expired(QUESTION)
+    previous = kept + stored_search(QUESTION)
+    assert new_evidence(previous, search_tavily(QUESTION)) == []
+
+
+def test_degraded_search_has_no_new_evidence(redis, monkeypatch):
+    kept = rerank_results({QUESTION: search_tavily(QUESTION)}, "Unemployment fell in 2023.", 3)[QUESTION]
+
+    expire_searches(redis)
+
+    def down(query, **kwargs):
+        raise ConnectionError("search is down")
+
+    monkeypatch.setattr(research_agent.tavily_client, "search", down)
+    previous = kept + stored_search(QUESTION)
+    assert new_evidence(previous, search_tavily(QUESTION)) == []
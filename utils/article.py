@@ -0,0 +1,127 @@
+import os
+import re
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from utils.llm import chat_completion
+from utils.tokens import count_tokens, truncate_to_tokens
+from utils.structured import structured_list
+from utils.dedup import deduplicate_questions
+from utils.log import fields
+
+logger = logging.getLogger(__name__)
+
+# new_question messages at least this long are checked as articles, unless
+# the message sets "mode" to "claim" or "article" explicitly
+ARTICLE_MIN_TOKENS = int(os.getenv("ARTICLE_MIN_TOKENS", 300))
+# Token size of the article segments claims are extracted from
+ARTICLE_SEGMENT_TOKENS = int(os.getenv("ARTICLE_SEGMENT_TOKENS", 1500))
+# Most claims extracted from one segment, and verified from one article
+ARTICLE_CLAIMS_PER_SEGMENT = int(os.getenv("ARTICLE_CLAIMS_PER_SEGMENT", 5))
+ARTICLE_MAX_CLAIMS = int(os.getenv("ARTICLE_MAX_CLAIMS", 10))
+# Claims of one article verified at the same time
+ARTICLE_WORKERS = int(os.getenv("ARTICLE_WORKERS", 4))
+# Token budget of each claim's verdict in the aggregate report prompt
+ARTICLE_VERDICT_TOKENS = int(os.getenv("ARTICLE_VERDICT_TOKENS", 600))
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def is_article(text: str, mode: str = None) -> bool:
+    """Whether a submitted text should be checked in article mode."""
+    if mode in ("claim", "article"):
+        return mode == "article"
+    return count_tokens(text) >= ARTICLE_MIN_TOKENS
+
+
+def segment_text(text: str, max_tokens: int = ARTICLE_SEGMENT_TOKENS) -> List[str]:
+    """Packs paragraphs into segments of at most `max_tokens` tokens,
+    splitting oversized paragraphs at sentence boundaries.
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(s for s in _SENTENCE_END.split(paragraph) if s.strip())
+
+    segments, current, current_tokens = [], [], 0
+    for piece in pieces:
+        tokens = count_tokens(piece)
+        if current and current_tokens + tokens > max_tokens:
+            segments.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(truncate_to_tokens(piece, max_tokens))
+        current_tokens += min(tokens, max_tokens)
+    if current:
+        segments.append("\n\n".join(current))
+    return segments
+
+
+def extract_segment_claims(segment: str) -> List[str]:
+    """Extracts the check-worthy factual claims from one segment."""
+    return structured_list(
+        model="gpt-4o",
+        stage="claim_extraction",
+        key="claims",
+        max_items=ARTICLE_CLAIMS_PER_SEGMENT,
+        messages=[
+            {
+                "role": "system",
+                "content": f"""Extract up to {ARTICLE_CLAIMS_PER_SEGMENT} check-worthy factual claims from this part of
+                              an article: specific, verifiable statements about figures, events, policies or
+                              what someone said. Rewrite each claim so it stands on its own, without pronouns
+                              or references to the article. Skip opinions, predictions and rhetoric. Return
+                              them as a JSON object with a 'claims' list, one claim per item.""",
+            },
+            {"role": "user", "content": segment},
+        ],
+        temperature=0.2,
+    )
+
+
+def extract_claims(text: str, max_claims: int = ARTICLE_MAX_CLAIMS) -> List[str]:
+    """Segments an article, extracts claims from every segment in parallel
+    and collapses near-duplicates (the same MinHash clustering used for
+    research questions), keeping the first `max_claims` in article order.
+    """
+    segments = segment_text(text)
+    logger.info("Extracting article claims", extra=fields(segments=len(segments)))
+    with ThreadPoolExecutor(max_workers=max(1, min(ARTICLE_WORKERS, len(segments)))) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, extract_segment_claims, s) for s in segments]
+        claims = [claim for future in futures for claim in future.result()]
+
+    claims, duplicates = deduplicate_questions(claims)
+    logger.info("Article claims extracted", extra=fields(count=len(claims), dropped=duplicates, claims=claims))
+    return claims[:max_claims]
+
+
+def aggregate_report(records: List[Dict[str, Any]]) -> str:
+    """Summarizes the per-claim verdicts of an article into one report."""
+    verdicts = "\n\n".join(
+        f"Claim {i + 1}: {record['claim']}\nVerdict: "
+        + (truncate_to_tokens(record.get("verdict") or "", ARTICLE_VERDICT_TOKENS)
+           if record["status"] == "ok" else f"Not verified ({record.get('error')})")
+        for i, record in enumerate(records)
+    )
+    return chat_completion(
+        model="gpt-4o",
+        stage="article_report",
+        messages=[
+            {
+                "role": "system",
+                "content": """Write a report on the overall reliability of an article from the verdicts on
+                              the individual claims it makes. Start with an overall assessment, then list
+                              each claim with a one-line verdict, and point out which false or misleading
+                              claims matter most to the article's message. Be unbiased and concise.
+                              Do not include any information about your cutoff date or that you are an AI agent.""",
+            },
+            {"role": "user", "content": verdicts},
+        ],
+        temperature=0.3,
+    )
@@ -0,0 +1,124 @@
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict
+
+from utils.log import fields
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failed (or too slow) calls that open a breaker
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", 5))
+# Seconds an open breaker rejects calls before letting one probe through;
+# doubled after each failed probe, up to BREAKER_MAX_COOLDOWN
+BREAKER_COOLDOWN = float(os.getenv("BREAKER_COOLDOWN", 30))
+BREAKER_MAX_COOLDOWN = float(os.getenv("BREAKER_MAX_COOLDOWN", 300))
+# Calls slower than this count as failures (the result is still used)
+SEARCH_SLOW_SECONDS = float(os.getenv("SEARCH_SLOW_SECONDS", 10))
+LLM_SLOW_SECONDS = float(os.getenv("LLM_SLOW_SECONDS", 60))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"{name} circuit is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """Per-process circuit breaker for one upstream dependency.
+
+    Closed, it passes calls through and counts consecutive failures, where
+    a call slower than `slow_seconds` also fails. After `failures` of them
+    it opens and rejects calls with CircuitOpenError for the cooldown.
+    Then it is half-open: one probe call goes through while the others are
+    still rejected. A successful probe closes it; a failed one opens it
+    again with a doubled cooldown.
+    """
+
+    def __init__(self, name: str, slow_seconds: float, failures: int = BREAKER_FAILURES):
+        self.name = name
+        self.slow_seconds = slow_seconds
+        self.failures = failures
+        self.state = "closed"
+        self._consecutive = 0
+        self._cooldown = BREAKER_COOLDOWN
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.totals = {"calls": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def rejecting(self) -> bool:
+        """Whether a call made now would be rejected (without taking the probe)."""
+        with self._lock:
+            if self.state == "open":
+                return time.monotonic() - self._opened_at < self._cooldown
+            return self.state == "half_open" and self._probing
+
+    def _allow(self) -> bool:
+        with self._lock:
+            if self.state == "open" and time.monotonic() - self._opened_at >= self._cooldown:
+                self.state = "half_open"
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                logger.info("Probing upstream", extra=fields(breaker=self.name))
+                return True
+            self.totals["rejected"] += 1
+            return False
+
+    def _record(self, ok: bool, seconds: float) -> None:
+        with self._lock:
+            self.totals["calls"] += 1
+            if ok:
+                if self.state == "open":
+                    # A late success of a call made before the breaker opened
+                    return
+                if self.state != "closed":
+                    logger.info("Circuit closed", extra=fields(breaker=self.name, seconds=round(seconds, 2)))
+                self.state = "closed"
+                self._consecutive = 0
+                self._cooldown = BREAKER_COOLDOWN
+                self._probing = False
+                return
+            self.totals["failures"] += 1
+            self._consecutive += 1
+            if self.state == "half_open":
+                self._cooldown = min(self._cooldown * 2, BREAKER_MAX_COOLDOWN)
+            elif self.state == "open" or self._consecutive < self.failures:
+                # Late results of calls made before the breaker opened
+                return
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._probing = False
+            self.totals["opened"] += 1
+            logger.warning("Circuit opened", extra=fields(
+                breaker=self.name, failures=self._consecutive, cooldown=self._cooldown,
+            ))
+
+    def call(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Calls `fn` through the breaker, raising CircuitOpenError when open."""
+        if not self._allow():
+            raise CircuitOpenError(self.name)
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self._record(False, time.monotonic() - started)
+            raise
+        seconds = time.monotonic() - started
+        if seconds > self.slow_seconds:
+            logger.warning("Slow upstream call", extra=fields(breaker=self.name, seconds=round(seconds, 2)))
+        self._record(seconds <= self.slow_seconds, seconds)
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self._consecutive, **self.totals}
+
+
+search_breaker = CircuitBreaker("search", SEARCH_SLOW_SECONDS)
+llm_breaker = CircuitBreaker("llm", LLM_SLOW_SECONDS)
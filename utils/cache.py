@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+# Cache sizing, configurable from the environment
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", 2048))
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", 24 * 60 * 60))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", 1024))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 6 * 60 * 60))
+# Back the LLM cache with Redis so every worker reuses each other's completions
+LLM_CACHE_SHARED = os.getenv("LLM_CACHE_SHARED", "true").lower() == "true"
+
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after `ttl` seconds.
+    Shared by every pipeline run in the process, so concurrent batch workers
+    reuse each other's search results and LLM completions.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+def make_cache_key(*parts: Any) -> str:
+    """Builds a stable cache key from JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SharedCache:
+    """A TTLCache in front of a Redis tier shared by every worker process.
+    Local misses are looked up in Redis (and kept locally on a hit); sets
+    go to both. Values must be JSON-serializable. Without a Redis client
+    it is just the local cache.
+    """
+
+    def __init__(self, namespace: str, local: TTLCache):
+        self.namespace = namespace
+        self.local = local
+        self._redis_client = None
+        self.shared_hits = 0
+
+    def configure(self, redis_client) -> None:
+        self._redis_client = redis_client
+
+    def _key(self, key: str) -> str:
+        return f"cache:{self.namespace}:{key}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None or self._redis_client is None:
+            return value
+        data = self._redis_client.get(self._key(key))
+        if data is None:
+            return None
+        value = json.loads(data)
+        self.local.set(key, value)
+        self.shared_hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        if self._redis_client is not None:
+            self._redis_client.set(self._key(key), json.dumps(value), ex=self.local.ttl)
+
+    def stats(self) -> dict:
+        return {**self.local.stats(), "shared_hits": self.shared_hits}
+
+
+def configure_shared_cache(redis_client) -> None:
+    """Enables the Redis tier of the LLM cache (unless LLM_CACHE_SHARED is off)."""
+    if LLM_CACHE_SHARED:
+        llm_cache.configure(redis_client)
+
+
+search_cache = TTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+# Search results are shared across workers by utils.evidence_store instead
+llm_cache = SharedCache("llm", TTLCache(LLM_CACHE_SIZE, LLM_CACHE_TTL))
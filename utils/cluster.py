@@ -0,0 +1,114 @@
+import os
+import json
+import time
+import socket
+import atexit
+import logging
+import threading
+from typing import Any, Dict
+
+from utils.log import fields
+
+logger = logging.getLogger(__name__)
+
+# Web worker processes started by `python main.py` (behind gunicorn or
+# `uvicorn --workers`, set it to the same count)
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", 1))
+# Seconds between writes of this worker's metrics to Redis
+METRICS_SYNC_SECONDS = float(os.getenv("METRICS_SYNC_SECONDS", 5))
+# Seconds after which a worker that stopped reporting drops out of the metrics
+METRICS_RETENTION = int(os.getenv("METRICS_RETENTION", 24 * 60 * 60))
+
+# Identifies this process in shared metrics
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Metrics objects (with snapshot() and summary(counters)) shared by name
+_shared_metrics: Dict[str, Any] = {}
+
+# Redis client the metrics are shared through, set once at startup
+_redis_client = None
+
+
+def _metrics_key(name: str) -> str:
+    return f"metrics:{name}"
+
+
+def share_metrics(name: str, metrics: Any) -> None:
+    """Registers process-local metrics to be merged across workers."""
+    _shared_metrics[name] = metrics
+
+
+def merge_counters(total: Any, counters: Any) -> Any:
+    """Adds one worker's counters into a running total: numbers are summed
+    (or maxed for "max_*" keys), nested dicts merged, anything else taken
+    from the newer value.
+    """
+    if isinstance(total, dict) and isinstance(counters, dict):
+        merged = dict(total)
+        for key, value in counters.items():
+            if key not in merged:
+                merged[key] = value
+            elif key.startswith("max_") and isinstance(value, (int, float)):
+                merged[key] = max(merged[key], value)
+            else:
+                merged[key] = merge_counters(merged[key], value)
+        return merged
+    if isinstance(total, (int, float)) and isinstance(counters, (int, float)) and not isinstance(counters, bool):
+        return total + counters
+    return counters
+
+
+def sync_metrics() -> None:
+    """Writes this worker's current counters to Redis."""
+    pipe = _redis_client.pipeline(transaction=False)
+    for name, metrics in _shared_metrics.items():
+        pipe.hset(_metrics_key(name), WORKER_ID, json.dumps({"at": time.time(), "counters": metrics.snapshot()}))
+        pipe.expire(_metrics_key(name), METRICS_RETENTION)
+    pipe.execute()
+
+
+def cluster_summary(name: str) -> Dict[str, Any]:
+    """Summary of the named metrics over every worker that reported within
+    METRICS_RETENTION, using this worker's live counters for itself.
+    Without Redis this is the local summary.
+    """
+    metrics = _shared_metrics[name]
+    if _redis_client is None:
+        return metrics.summary()
+    total = metrics.snapshot()
+    stale = []
+    for worker_id, snapshot in _redis_client.hgetall(_metrics_key(name)).items():
+        worker_id = worker_id.decode() if isinstance(worker_id, bytes) else worker_id
+        if worker_id == WORKER_ID:
+            continue
+        snapshot = json.loads(snapshot)
+        if snapshot["at"] < time.time() - METRICS_RETENTION:
+            stale.append(worker_id)
+            continue
+        total = merge_counters(total, snapshot["counters"])
+    if stale:
+        _redis_client.hdel(_metrics_key(name), *stale)
+    return metrics.summary(total)
+
+
+def _try_sync() -> None:
+    try:
+        sync_metrics()
+    except Exception as e:
+        logger.warning("Could not share metrics", extra=fields(error=str(e)))
+
+
+def _sync_loop() -> None:
+    while True:
+        time.sleep(METRICS_SYNC_SECONDS)
+        _try_sync()
+
+
+def configure_cluster(redis_client) -> None:
+    """Starts sharing the registered metrics through Redis, every
+    METRICS_SYNC_SECONDS and once more at exit.
+    """
+    global _redis_client
+    _redis_client = redis_client
+    threading.Thread(target=_sync_loop, name="metrics-sync", daemon=True).start()
+    atexit.register(_try_sync)
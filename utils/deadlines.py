@@ -0,0 +1,35 @@
+import os
+import time
+import contextvars
+from typing import List
+
+# Overall wall-clock budget for one claim, in seconds
+CLAIM_DEADLINE = float(os.getenv("CLAIM_DEADLINE", 300))
+
+# Deadline and degraded stages of the claim running in the current context
+_claim_run = contextvars.ContextVar("claim_run", default=None)
+
+
+def start_claim_deadline(seconds: float = CLAIM_DEADLINE) -> None:
+    """Starts the overall deadline for the claim run in this context."""
+    _claim_run.set({"deadline": time.monotonic() + seconds, "degraded": []})
+
+
+def remaining_claim_time() -> float:
+    """Seconds left before the claim deadline (infinite outside a run)."""
+    run = _claim_run.get()
+    if run is None:
+        return float("inf")
+    return run["deadline"] - time.monotonic()
+
+
+def record_degraded_stage(stage: str) -> None:
+    """Notes that a stage returned partial output because of a deadline."""
+    run = _claim_run.get()
+    if run is not None and stage not in run["degraded"]:
+        run["degraded"].append(stage)
+
+
+def degraded_stages() -> List[str]:
+    run = _claim_run.get()
+    return list(run["degraded"]) if run else []
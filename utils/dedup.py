@@ -0,0 +1,82 @@
+import os
+import re
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from utils.retrieval import tokenize
+
+# Estimated Jaccard similarity above which two questions are near-duplicates
+QUESTION_DEDUP_THRESHOLD = float(os.getenv("QUESTION_DEDUP_THRESHOLD", 0.5))
+# Number of MinHash permutations per question
+MINHASH_PERMUTATIONS = 64
+
+# Tavily rejects queries outside this length range
+MIN_QUESTION_LENGTH = 4
+MAX_QUESTION_LENGTH = 400
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, (1 << 61) - 1, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, (1 << 61) - 1, size=MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]+|\d+[.)]|q\d+[.:)]|question\s*\d+[.:)])\s*", re.IGNORECASE)
+_INTERROGATIVES = {
+    "what", "how", "why", "when", "where", "which", "who", "whom", "whose", "is", "are",
+    "was", "were", "do", "does", "did", "can", "could", "has", "have", "had", "will",
+    "would", "should",
+}
+
+
+def clean_question(line: str) -> Optional[str]:
+    """Strips list numbering and markdown from a generated line and returns
+    the question, or None for headers, preambles and other non-questions.
+    """
+    text = _LIST_MARKER.sub("", line.strip())
+    text = text.replace("**", "").strip().strip('"').strip()
+    if not (MIN_QUESTION_LENGTH <= len(text) <= MAX_QUESTION_LENGTH):
+        return None
+    if text.endswith(":"):
+        return None
+    if not (text.endswith("?") or text.split()[0].lower() in _INTERROGATIVES):
+        return None
+    return text
+
+
+def _shingles(text: str) -> np.ndarray:
+    """Hashes the word unigrams and bigrams of a question (stopwords
+    removed) so reordered phrasings still share most shingles.
+    """
+    tokens = tokenize(text)
+    grams = set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+    return np.array([zlib.crc32(g.encode("utf-8")) for g in grams] or [0], dtype=np.uint64)
+
+
+def minhash_signatures(texts: List[str]) -> np.ndarray:
+    """Computes a (texts x permutations) MinHash signature matrix."""
+    signatures = np.empty((len(texts), MINHASH_PERMUTATIONS), dtype=np.uint64)
+    for i, text in enumerate(texts):
+        hashes = _shingles(text)
+        permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+        signatures[i] = permuted.min(axis=1)
+    return signatures
+
+
+def deduplicate_questions(
+    questions: List[str], threshold: float = QUESTION_DEDUP_THRESHOLD
+) -> Tuple[List[str], int]:
+    """Clusters near-duplicate questions by estimated Jaccard similarity
+    and keeps the first question of each cluster, preserving order.
+    Returns the kept questions and the number dropped.
+    """
+    if len(questions) < 2:
+        return list(questions), 0
+    signatures = minhash_signatures(questions)
+    similarity = (signatures[:, None, :] == signatures[None, :, :]).mean(axis=2)
+
+    kept = []
+    for i in range(len(questions)):
+        if all(similarity[i, j] < threshold for j in kept):
+            kept.append(i)
+    return [questions[i] for i in kept], len(questions) - len(kept)
@@ -0,0 +1,27 @@
+import os
+import contextvars
+
+# "quick" stops after the analysis, "standard" after the draft report and
+# "full" runs every stage through objectivity, visualization and feedback
+PIPELINE_DEPTHS = ("quick", "standard", "full")
+PIPELINE_DEPTH = os.getenv("PIPELINE_DEPTH", "full")
+# Token budget for the key evidence sent with a quick verdict
+QUICK_EVIDENCE_TOKENS = int(os.getenv("QUICK_EVIDENCE_TOKENS", 1000))
+
+# Depth of the claim running in the current context
+_pipeline_depth = contextvars.ContextVar("pipeline_depth", default=PIPELINE_DEPTH)
+
+
+def validate_depth(depth: str) -> str:
+    if depth not in PIPELINE_DEPTHS:
+        raise ValueError(f"Unknown pipeline depth '{depth}', expected one of {', '.join(PIPELINE_DEPTHS)}.")
+    return depth
+
+
+def set_pipeline_depth(depth: str) -> None:
+    """Sets how far the claim run in this context goes."""
+    _pipeline_depth.set(validate_depth(depth))
+
+
+def pipeline_depth() -> str:
+    return _pipeline_depth.get()
@@ -0,0 +1,51 @@
+import os
+import json
+from typing import Dict
+from urllib.parse import urlsplit
+
+# Reliable government sources searched by default
+DEFAULT_DOMAINS = [
+    "cia.gov",
+    "fbi.gov",
+    "state.gov",
+    "congress.gov",
+    "uscis.gov",
+    "nasa.gov",
+    "nih.gov",
+    "cdc.gov",
+    "epa.gov",
+    "treasury.gov",
+    "justice.gov",
+    "defense.gov",
+    "energy.gov",
+    "commerce.gov",
+    "labor.gov",
+    "transportation.gov",
+    "hud.gov",
+    "education.gov",
+    "va.gov",
+]
+
+# Trust prior per domain, overridable with a JSON object in DOMAIN_TRUST,
+# e.g. DOMAIN_TRUST='{"cdc.gov": 1.0, "defense.gov": 0.6}'
+DEFAULT_DOMAIN_TRUST = float(os.getenv("DEFAULT_DOMAIN_TRUST", 0.5))
+DOMAIN_TRUST: Dict[str, float] = {domain: 1.0 for domain in DEFAULT_DOMAINS}
+DOMAIN_TRUST.update(json.loads(os.getenv("DOMAIN_TRUST", "{}")))
+
+
+def domain_of(url: str) -> str:
+    """Returns the host of a URL without a leading `www.`."""
+    host = urlsplit(url or "").netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def domain_trust(url: str) -> float:
+    """Looks up the trust prior for a URL, matching subdomains of listed
+    domains (e.g. `www.cdc.gov` and `wonder.cdc.gov` both match `cdc.gov`).
+    """
+    host = domain_of(url)
+    while host:
+        if host in DOMAIN_TRUST:
+            return DOMAIN_TRUST[host]
+        _, _, host = host.partition(".")
+    return DEFAULT_DOMAIN_TRUST
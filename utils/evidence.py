@@ -0,0 +1,132 @@
+import re
+import hashlib
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from utils.cache import TTLCache, make_cache_key
+from utils.tokens import count_tokens
+from utils.records import EvidenceRecord
+
+# Placeholder marking where the evidence goes in a prompt built by build_prompt
+EVIDENCE = object()
+
+# Rendered artifacts, keyed by a hash of the research data they came from
+_artifact_cache = TTLCache(maxsize=128, ttl=60 * 60)
+
+
+def canonical_url(url: str) -> str:
+    """Normalizes a URL so the same page fetched twice compares equal."""
+    if not url:
+        return ""
+    parts = urlsplit(url.strip().lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def _snippet_hash(snippet: str) -> str:
+    normalized = re.sub(r"\s+", " ", snippet or "").strip().lower()
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest() if normalized else ""
+
+
+class EvidenceArtifact:
+    """Research data rendered once into deduplicated markdown entries.
+
+    Results repeated across questions (same canonical URL or same snippet)
+    are kept only under the first question they appear in. `render` then
+    selects entries by priority until a token budget is used up: every
+    question's best result first, then every question's second best, and
+    so on, ordered within each round by rerank relevance (or Tavily's
+    score when results were not reranked).
+    """
+
+    def __init__(self, research_data: Dict[str, List[EvidenceRecord]]):
+        self.questions = list(research_data)
+        self.entries = []
+        self.duplicates = 0
+        seen_urls, seen_snippets = set(), set()
+
+        for question, results in research_data.items():
+            rank = 0
+            for result in results:
+                url_key = canonical_url(result.url)
+                snippet = result.snippet
+                snippet_key = _snippet_hash(snippet)
+                if (url_key and url_key in seen_urls) or (snippet_key and snippet_key in seen_snippets):
+                    self.duplicates += 1
+                    continue
+                seen_urls.add(url_key)
+                seen_snippets.add(snippet_key)
+
+                source = result.source or "Unknown Source"
+                body = (
+                    f"   - **Title:** {result.title or 'No Title'}\n"
+                    f"   - **URL:** {result.url or 'No URL'}\n"
+                    f"   - **Snippet:** {snippet}\n\n"
+                )
+                self.entries.append({
+                    "question": question,
+                    "rank": rank,
+                    "priority": float(result.relevance if result.relevance is not None else result.score or 0.0),
+                    "source": source,
+                    "body": body,
+                    "tokens": count_tokens(f"**Result {rank + 1} ({source}):**\n{body}"),
+                })
+                rank += 1
+
+        self.heading_tokens = {q: count_tokens(f"## {q}\n") for q in self.questions}
+        self.order = sorted(
+            range(len(self.entries)),
+            key=lambda i: (self.entries[i]["rank"], -self.entries[i]["priority"]),
+        )
+
+    def render(self, max_tokens: int = None) -> str:
+        """Renders the highest-priority entries that fit in `max_tokens`
+        (all entries when no budget is given), grouped by question.
+        """
+        selected, opened, used = set(), set(), 0
+        for i in self.order:
+            entry = self.entries[i]
+            cost = entry["tokens"]
+            if entry["question"] not in opened:
+                cost += self.heading_tokens[entry["question"]]
+            if max_tokens is not None and used + cost > max_tokens:
+                continue
+            selected.add(i)
+            opened.add(entry["question"])
+            used += cost
+
+        formatted_research = ""
+        for question in self.questions:
+            entries = [e for i, e in enumerate(self.entries) if i in selected and e["question"] == question]
+            if not entries:
+                continue
+            formatted_research += f"## {question}\n"
+            for n, entry in enumerate(entries):
+                formatted_research += f"**Result {n + 1} ({entry['source']}):**\n{entry['body']}"
+        return formatted_research
+
+
+def get_evidence_artifact(research_data: Dict[str, List[EvidenceRecord]]) -> EvidenceArtifact:
+    """Returns the rendered evidence artifact for the research data, building
+    it only the first time a given session's research data is seen.
+    """
+    key = make_cache_key("evidence", research_data)
+    artifact = _artifact_cache.get(key)
+    if artifact is None:
+        artifact = EvidenceArtifact(research_data)
+        _artifact_cache.set(key, artifact)
+    return artifact
+
+
+def build_prompt(fields: List[Tuple[str, Any]], artifact: EvidenceArtifact, max_tokens: int) -> str:
+    """Renders `Label: value` lines, filling the field whose value is
+    EVIDENCE with as much of the artifact as fits in the remaining budget.
+    """
+    fixed = "\n".join(f"{label}: {value}" for label, value in fields if value is not EVIDENCE)
+    evidence_budget = max(0, max_tokens - count_tokens(fixed))
+    lines = []
+    for label, value in fields:
+        if value is EVIDENCE:
+            value = artifact.render(evidence_budget)
+        lines.append(f"{label}: {value}")
+    return "\n".join(lines)
@@ -0,0 +1,135 @@
+import os
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from utils.cache import SEARCH_CACHE_TTL, make_cache_key
+from utils.evidence import canonical_url
+from utils.records import EvidenceRecord
+
+# Sliding TTL of shared evidence; refreshed whenever a session loads it
+EVIDENCE_TTL = int(os.getenv("EVIDENCE_TTL", 30 * 24 * 60 * 60))
+
+# Record fields that belong to a (question, result) pair rather than the page
+QUESTION_FIELDS = ("score", "relevance")
+
+# Redis client for the search-level store, set once at startup
+_redis_client = None
+
+
+def configure_evidence_store(redis_client) -> None:
+    """Enables sharing search results across sessions and processes."""
+    global _redis_client
+    _redis_client = redis_client
+
+
+def evidence_ref(record: EvidenceRecord) -> str:
+    """Content-addressed reference for a result: its canonical URL plus a
+    hash of its text, so a changed page gets a new entry.
+    """
+    digest = hashlib.sha256(f"{canonical_url(record.url)}\n{record.snippet or ''}".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def _evidence_key(ref: str) -> str:
+    return f"evidence:{ref}"
+
+
+def put_evidence(redis_client, records: List[EvidenceRecord]) -> List[Dict[str, Any]]:
+    """Stores each record's page fields once in the shared store and returns
+    lightweight references carrying the question-specific scores.
+    """
+    refs = []
+    pipe = redis_client.pipeline(transaction=False)
+    for record in records:
+        ref = evidence_ref(record)
+        pipe.set(_evidence_key(ref), json.dumps(record.to_dict(EvidenceRecord.PAGE_FIELDS)), ex=EVIDENCE_TTL)
+        refs.append({"ref": ref, **record.to_dict(QUESTION_FIELDS)})
+    pipe.execute()
+    return refs
+
+
+def get_evidence(redis_client, refs: List[Dict[str, Any]]) -> List[EvidenceRecord]:
+    """Resolves references back into records, refreshing their TTL. Records
+    whose evidence has expired are dropped.
+    """
+    if not refs:
+        return []
+    bodies = redis_client.mget([_evidence_key(r["ref"]) for r in refs])
+    pipe = redis_client.pipeline(transaction=False)
+    results = []
+    for ref, body in zip(refs, bodies):
+        if body is None:
+            continue
+        pipe.expire(_evidence_key(ref["ref"]), EVIDENCE_TTL)
+        data = json.loads(body)
+        data.update((k, v) for k, v in ref.items() if k != "ref")
+        results.append(EvidenceRecord.from_dict(data))
+    pipe.execute()
+    return results
+
+
+def dehydrate_research(redis_client, research_data: Dict[str, List[EvidenceRecord]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Replaces a session's research results with references into the store."""
+    return {question: put_evidence(redis_client, results) for question, results in research_data.items()}
+
+
+def hydrate_research(redis_client, research_refs: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[EvidenceRecord]]:
+    """Rebuilds a session's research results from its references."""
+    return {question: get_evidence(redis_client, refs) for question, refs in research_refs.items()}
+
+
+def _search_key(query: str, domains: List[str]) -> str:
+    return f"evidence:search:{make_cache_key(query, domains)}"
+
+
+def _stale_search_key(query: str, domains: List[str]) -> str:
+    return f"evidence:search:stale:{make_cache_key(query, domains)}"
+
+
+def store_search(query: str, domains: List[str], results: List[EvidenceRecord]) -> None:
+    """Shares a search's results with other sessions and processes for
+    SEARCH_CACHE_TTL seconds, and keeps them for EVIDENCE_TTL seconds as a
+    fallback while search is unavailable.
+    """
+    if _redis_client is None:
+        return
+    refs = put_evidence(_redis_client, results)
+    pipe = _redis_client.pipeline(transaction=False)
+    pipe.set(_search_key(query, domains), json.dumps(refs), ex=SEARCH_CACHE_TTL)
+    pipe.set(_stale_search_key(query, domains), json.dumps(refs), ex=EVIDENCE_TTL)
+    pipe.execute()
+
+
+def search_stored(query: str, domains: List[str]) -> bool:
+    """Whether a search's shared results are still within SEARCH_CACHE_TTL."""
+    if _redis_client is None:
+        return False
+    return bool(_redis_client.exists(_search_key(query, domains)))
+
+
+def load_search(query: str, domains: List[str]) -> Optional[List[EvidenceRecord]]:
+    """Returns a search's shared results, or None if it is not stored (or
+    any of its evidence has expired).
+    """
+    if _redis_client is None:
+        return None
+    refs_json = _redis_client.get(_search_key(query, domains))
+    if refs_json is None:
+        return None
+    refs = json.loads(refs_json)
+    results = get_evidence(_redis_client, refs)
+    return results if len(results) == len(refs) else None
+
+
+def load_stale_search(query: str, domains: List[str]) -> Optional[List[EvidenceRecord]]:
+    """Returns the last results of a search even after SEARCH_CACHE_TTL,
+    without the evidence that has expired since, or None if it was never
+    stored. Used only while search is unavailable.
+    """
+    if _redis_client is None:
+        return None
+    refs_json = _redis_client.get(_stale_search_key(query, domains))
+    if refs_json is None:
+        return None
+    return get_evidence(_redis_client, json.loads(refs_json))
@@ -0,0 +1,102 @@
+import os
+import logging
+import json
+from typing import Any, Dict, List, Optional
+
+from utils.llm import chat_completion
+from utils.tokens import count_tokens
+from utils.log import fields
+
+logger = logging.getLogger(__name__)
+
+# Token budget for the follow-up history (summary plus verbatim turns)
+FOLLOWUP_HISTORY_TOKENS = int(os.getenv("FOLLOWUP_HISTORY_TOKENS", 1500))
+# Number of most recent turns always kept verbatim
+FOLLOWUP_RECENT_TURNS = int(os.getenv("FOLLOWUP_RECENT_TURNS", 2))
+# How long follow-up history is kept in Redis after the last turn
+FOLLOWUP_MEMORY_TTL = int(os.getenv("FOLLOWUP_MEMORY_TTL", 7 * 24 * 60 * 60))
+
+
+def _memory_key(session_id: str) -> str:
+    return f"{session_id}:followups"
+
+
+def load_followup_memory(redis_client, session_id: str) -> Dict[str, Any]:
+    """Loads a session's follow-up history from Redis."""
+    data_json = redis_client.get(_memory_key(session_id))
+    if data_json:
+        return json.loads(data_json)
+    return {"summary": "", "turns": []}
+
+
+def save_followup_memory(redis_client, session_id: str, memory: Dict[str, Any]) -> None:
+    """Stores a session's follow-up history in Redis."""
+    redis_client.set(_memory_key(session_id), json.dumps(memory), ex=FOLLOWUP_MEMORY_TTL)
+
+
+def clear_followup_memory(redis_client, session_id: str) -> None:
+    """Drops a session's follow-up history, e.g. when a new claim starts."""
+    redis_client.delete(_memory_key(session_id))
+
+
+def _format_turns(turns: List[Dict[str, str]]) -> str:
+    return "\n\n".join(f"User: {t['question']}\nAssistant: {t['answer']}" for t in turns)
+
+
+def format_followup_memory(memory: Dict[str, Any]) -> str:
+    """Renders the summary and recent turns for inclusion in a prompt."""
+    parts = []
+    if memory.get("summary"):
+        parts.append(f"Summary of earlier questions: {memory['summary']}")
+    if memory.get("turns"):
+        parts.append(_format_turns(memory["turns"]))
+    return "\n\n".join(parts)
+
+
+def summarize_followups(summary: str, turns: List[Dict[str, str]]) -> Optional[str]:
+    """Folds older follow-up turns into the running summary. Returns None
+    when the stage is degraded (deadline or open LLM circuit).
+    """
+    logger.info("Compacting follow-up history", extra=fields(turns=len(turns)))
+    return chat_completion(
+        model="gpt-4o",
+        stage="followup_summary",
+        fallback=None,
+        messages=[
+            {
+                "role": "system",
+                "content": """Update the running summary of a follow-up conversation about a truth
+                              analysis report with the new turns below. Keep the facts, conclusions and
+                              open questions the user cares about; drop pleasantries and repetition.
+                              Reply with the updated summary only.""",
+            },
+            {
+                "role": "user",
+                "content": f"Current Summary: {summary or 'None'}\n\nNew Turns:\n{_format_turns(turns)}",
+            },
+        ],
+        temperature=0.2,
+        max_tokens=FOLLOWUP_HISTORY_TOKENS // 2,
+    )
+
+
+def add_followup_turn(memory: Dict[str, Any], question: str, answer: str) -> Dict[str, Any]:
+    """Appends a turn and, once the history exceeds its token budget,
+    compacts all but the most recent turns into the running summary. If
+    compaction is degraded the turns are kept as they are, to be compacted
+    on a later turn.
+    """
+    turns = memory.get("turns", []) + [{"question": question, "answer": answer}]
+    memory = {"summary": memory.get("summary", ""), "turns": turns}
+    if count_tokens(format_followup_memory(memory)) <= FOLLOWUP_HISTORY_TOKENS:
+        return memory
+
+    keep = max(0, FOLLOWUP_RECENT_TURNS)
+    older, recent = turns[:len(turns) - keep], turns[len(turns) - keep:]
+    if not older:
+        return memory
+    summary = summarize_followups(memory["summary"], older)
+    if summary is None:
+        logger.warning("Follow-up compaction degraded, keeping turns", extra=fields(turns=len(turns)))
+        return memory
+    return {"summary": summary, "turns": recent}
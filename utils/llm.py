@@ -0,0 +1,150 @@
+import os
+import logging
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict
+
+from openai import OpenAI
+
+from utils.cache import llm_cache, make_cache_key
+from utils.deadlines import remaining_claim_time, record_degraded_stage
+from utils.routing import resolve_route, route_metrics
+from utils.log import fields
+from utils.profiling import call_timer
+from utils.breaker import CircuitOpenError, llm_breaker
+
+logger = logging.getLogger(__name__)
+
+# Shared OpenAI client used by every agent
+openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+# Per-stage deadlines in seconds, e.g. LLM_STAGE_DEADLINES='{"draft": 120}'
+LLM_STAGE_DEADLINE = float(os.getenv("LLM_STAGE_DEADLINE", 90))
+LLM_STAGE_DEADLINES = json.loads(os.getenv("LLM_STAGE_DEADLINES", "{}"))
+# Seconds before a duplicate request is fired (0 disables hedging)
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", 20))
+# Model for hedged and fallback requests (defaults to the stage's model)
+LLM_HEDGE_MODEL = os.getenv("LLM_HEDGE_MODEL", "")
+
+DEADLINE_NOTICE = "_This section is incomplete because it exceeded its time limit._"
+
+_llm_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_POOL_SIZE", 32)))
+
+
+def _complete(
+    messages: List[Dict[str, str]], model: str, temperature: float, kwargs: dict, route_name: str, timeout: float
+) -> str:
+    started = time.monotonic()
+    # Bounded by the stage's deadline, so calls abandoned at the deadline or
+    # by a hedge finish on their own instead of holding a pool thread
+    client = openai_client.with_options(timeout=timeout, max_retries=0)
+    try:
+        response = llm_breaker.call(
+            client.chat.completions.create,
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **kwargs,
+        )
+    except CircuitOpenError:
+        raise
+    except Exception:
+        route_metrics.record(route_name, model, time.monotonic() - started, error=True)
+        raise
+    route_metrics.record(route_name, model, time.monotonic() - started, response.usage)
+    return response.choices[0].message.content.strip()
+
+
+def chat_completion(
+    messages: List[Dict[str, str]],
+    model: str = "gpt-4o",
+    temperature: float = 0.3,
+    stage: str = "default",
+    fallback: str = DEADLINE_NOTICE,
+    **kwargs,
+) -> str:
+    """Runs a chat completion and returns the stripped message content.
+
+    The stage's entry in the routing table (see utils.routing) may override
+    the model, temperature and max_tokens passed here, and latency and token
+    usage are recorded per route. Identical requests are answered from the
+    shared LLM cache. If the call is still running after LLM_HEDGE_AFTER
+    seconds, or fails, a duplicate is sent (on LLM_HEDGE_MODEL if set) and
+    whichever finishes first wins. When the stage deadline or the overall
+    claim deadline passes first, or while the LLM circuit breaker is open
+    (see utils.breaker), `fallback` is returned and the stage is recorded
+    as degraded.
+    """
+    route_name, model, temperature, kwargs = resolve_route(stage, model, temperature, kwargs)
+    # Timed per call when the run is being profiled (see utils.profiling)
+    with call_timer("llm", stage, route=route_name, model=model) as call:
+        return _run_completion(messages, model, temperature, stage, fallback, kwargs, route_name, call)
+
+
+def _run_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    stage: str,
+    fallback: str,
+    kwargs: dict,
+    route_name: str,
+    call: dict,
+) -> str:
+    key = make_cache_key(model, messages, temperature, kwargs)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        call["outcome"] = "cache"
+        return cached
+
+    timeout = min(LLM_STAGE_DEADLINES.get(stage, LLM_STAGE_DEADLINE), remaining_claim_time())
+    if timeout <= 0:
+        logger.warning("Skipping stage: claim deadline already passed", extra=fields(stage=stage))
+        record_degraded_stage(stage)
+        call["outcome"] = "skipped"
+        return fallback
+    # Don't wait on an upstream that is known to be failing
+    if llm_breaker.rejecting():
+        logger.warning("Skipping stage: LLM circuit is open", extra=fields(stage=stage))
+        record_degraded_stage(stage)
+        call["outcome"] = "circuit_open"
+        return fallback
+    started = time.monotonic()
+    pending = {_llm_executor.submit(_complete, messages, model, temperature, kwargs, route_name, timeout)}
+    hedged = not LLM_HEDGE_AFTER
+    error = None
+
+    while pending:
+        elapsed = time.monotonic() - started
+        if elapsed >= timeout:
+            break
+        wait_for = timeout - elapsed if hedged else min(timeout, LLM_HEDGE_AFTER) - elapsed
+        done, pending = wait(pending, timeout=max(0, wait_for), return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                content = future.result()
+                llm_cache.set(key, content)
+                call.update(outcome="ok", hedged=bool(hedged and LLM_HEDGE_AFTER))
+                return content
+            error = future.exception()
+            logger.warning("LLM request failed", extra=fields(stage=stage, error=str(error)))
+        if not hedged and (error or time.monotonic() - started >= LLM_HEDGE_AFTER):
+            hedged = True
+            logger.info("Hedging LLM request", extra=fields(stage=stage))
+            pending.add(_llm_executor.submit(
+                _complete, messages, LLM_HEDGE_MODEL or model, temperature, kwargs,
+                f"{route_name}:hedge", max(1.0, timeout - (time.monotonic() - started)),
+            ))
+
+    if not pending and error is not None:
+        if not isinstance(error, CircuitOpenError):
+            raise error
+        # The breaker opened while this stage was waiting
+        record_degraded_stage(stage)
+        call["outcome"] = "circuit_open"
+        return fallback
+    logger.warning("Stage exceeded its deadline", extra=fields(stage=stage, timeout=round(timeout)))
+    record_degraded_stage(stage)
+    call["outcome"] = "deadline"
+    return fallback
@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import random
+import logging
+import contextvars
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# "json" for one JSON object per line, "text" for human-readable lines
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Longest string kept in a logged field; longer values are truncated
+LOG_FIELD_CHARS = int(os.getenv("LOG_FIELD_CHARS", 300))
+# Most list items / dict keys kept in a logged field
+LOG_FIELD_ITEMS = int(os.getenv("LOG_FIELD_ITEMS", 5))
+# Fraction of sampled payload records (full stage outputs) that are emitted
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", 0.1))
+
+# Session of the claim or socket being handled in the current context
+_session_id = contextvars.ContextVar("log_session_id", default=None)
+
+_listener = None
+
+
+def bind_session_id(session_id: str) -> None:
+    """Tags every record logged from this context with the session id."""
+    _session_id.set(session_id)
+
+
+def fields(sample: bool = False, **values: Any) -> Dict[str, Any]:
+    """Builds the `extra` for a structured record. Records with `sample=True`
+    are payload dumps and are only emitted for LOG_PAYLOAD_SAMPLE_RATE of
+    calls.
+    """
+    return {"fields": values, "sample": sample}
+
+
+def truncate(value: Any, depth: int = 0) -> Any:
+    """Shrinks a field for logging: long strings are cut, and long lists and
+    dicts keep their first LOG_FIELD_ITEMS entries plus a count.
+    """
+    if isinstance(value, str):
+        if len(value) <= LOG_FIELD_CHARS:
+            return value
+        return f"{value[:LOG_FIELD_CHARS]}... [{len(value)} chars]"
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    if depth >= 2:
+        return truncate(repr(value), depth)
+    if isinstance(value, dict):
+        items = list(value.items())
+        shown = {str(k): truncate(v, depth + 1) for k, v in items[:LOG_FIELD_ITEMS]}
+        if len(items) > LOG_FIELD_ITEMS:
+            shown["..."] = f"{len(items) - LOG_FIELD_ITEMS} more"
+        return shown
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        shown = [truncate(v, depth + 1) for v in items[:LOG_FIELD_ITEMS]]
+        if len(items) > LOG_FIELD_ITEMS:
+            shown.append(f"... {len(items) - LOG_FIELD_ITEMS} more")
+        return shown
+    return truncate(repr(value), depth)
+
+
+class ContextFilter(logging.Filter):
+    """Adds the session id and drops unsampled payload records. Runs in the
+    logging thread, before the record is queued.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sample", False) and random.random() >= LOG_PAYLOAD_SAMPLE_RATE:
+            return False
+        record.session_id = _session_id.get()
+        record.fields = truncate(getattr(record, "fields", None) or {})
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "session_id": getattr(record, "session_id", None),
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        session = getattr(record, "session_id", None)
+        extras = " ".join(f"{k}={v}" for k, v in getattr(record, "fields", {}).items())
+        return f"{self.formatTime(record)} {record.levelname} {record.name} [{session or '-'}] {record.getMessage()} {extras}".rstrip()
+
+
+def setup_logging(level: str = LOG_LEVEL) -> None:
+    """Routes all logging through a queue drained by a background thread,
+    so request handlers and pipeline threads never block on log I/O.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    log_queue = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else TextFormatter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
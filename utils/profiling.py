@@ -0,0 +1,220 @@
+import os
+import hmac
+import json
+import time
+import random
+import pstats
+import cProfile
+import logging
+import marshal
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from utils.log import fields
+
+logger = logging.getLogger(__name__)
+
+# Fraction of claims profiled without being asked to (0 disables sampling)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+# Seconds a stored profile is kept
+PROFILE_TTL = int(os.getenv("PROFILE_TTL", 7 * 24 * 60 * 60))
+# Functions listed in a profile's summary, by cumulative time
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", 40))
+# Most recent profiles listed by the admin route
+PROFILE_INDEX_SIZE = 1000
+# Token expected in the X-Admin-Token header (admin routes are off when unset)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# Sorted set of profiled session ids, scored by the time of their profile
+PROFILES_KEY = "profiles"
+
+# Profile of the run executing in this context, if it is being profiled
+_active_profile = contextvars.ContextVar("active_profile", default=None)
+# Only one cProfile profiler can run in the process at a time
+_cpu_profiler_lock = threading.Lock()
+
+# Redis client the profiles are stored in, set once at startup
+_redis_client = None
+
+
+def configure_profiling(redis_client) -> None:
+    global _redis_client
+    _redis_client = redis_client
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """Checks an X-Admin-Token header value against ADMIN_TOKEN."""
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token or "", ADMIN_TOKEN)
+
+
+def profile_reason(requested: bool) -> Optional[str]:
+    """Why a run should be profiled ("requested" or "sampled"), or None."""
+    if requested:
+        return "requested"
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def _key(session_id: str) -> str:
+    return f"profile:{session_id}"
+
+
+def _pstats_key(session_id: str) -> str:
+    return f"profile:{session_id}:pstats"
+
+
+class RunProfile:
+    """Timings collected for one profiled run: every outbound call, plus
+    the CPU profile when the profiler was free.
+    """
+
+    def __init__(self, session_id: str, reason: str):
+        self.session_id = session_id
+        self.reason = reason
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.calls: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.summary: Dict[str, Any] = {}
+        self.pstats: Optional[bytes] = None
+
+    def record_call(self, kind: str, name: str, seconds: float, started: float, **info: Any) -> None:
+        with self._lock:
+            self.calls.append({
+                "kind": kind,
+                "name": name[:200],
+                "start": round(started - self._started, 4),
+                "seconds": round(seconds, 4),
+                "thread": threading.current_thread().name,
+                **info,
+            })
+
+    def finish(self, wall_seconds: float, cpu_seconds: float, profiler: Optional[cProfile.Profile]) -> None:
+        totals = {}
+        for call in self.calls:
+            total = totals.setdefault(call["kind"], {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+            total["calls"] += 1
+            total["seconds"] = round(total["seconds"] + call["seconds"], 4)
+            total["max_seconds"] = max(total["max_seconds"], call["seconds"])
+        self.summary = {
+            "session_id": self.session_id,
+            "reason": self.reason,
+            "started_at": self.started_at,
+            "wall_seconds": round(wall_seconds, 4),
+            "cpu_seconds": round(cpu_seconds, 4),
+            "call_totals": totals,
+            "calls": self.calls,
+            "functions": [],
+        }
+        if profiler is None:
+            return
+        profiler.create_stats()
+        # The format written by pstats.Stats.dump_stats, loadable by snakeviz etc.
+        self.pstats = marshal.dumps(profiler.stats)
+        stats = pstats.Stats(profiler).sort_stats("cumulative")
+        for func in stats.fcn_list[:PROFILE_TOP_FUNCTIONS]:
+            primitive_calls, total_calls, own_time, cumulative_time, _ = stats.stats[func]
+            filename, line, name = func
+            self.summary["functions"].append({
+                "function": f"{filename}:{line}({name})",
+                "calls": total_calls,
+                "own_seconds": round(own_time, 4),
+                "cumulative_seconds": round(cumulative_time, 4),
+            })
+
+
+@contextmanager
+def call_timer(kind: str, name: str, **info: Any):
+    """Times an outbound call (LLM, search) if the current run is being
+    profiled. Yields a dict the caller can add details to, e.g. `outcome`.
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        yield info
+        return
+    started = time.perf_counter()
+    try:
+        yield info
+    except Exception as e:
+        info["outcome"] = "error"
+        info["error"] = str(e)[:200]
+        raise
+    finally:
+        profile.record_call(kind, name, time.perf_counter() - started, started, **info)
+
+
+@contextmanager
+def profile_run(session_id: str, reason: Optional[str]):
+    """Profiles the run in this block when `reason` is set: wall and CPU
+    time, a cProfile profile (of this thread; of every thread from Python
+    3.12, where cProfile is process-wide) and the timings of outbound
+    calls from this context (and worker threads copying it). The artifact
+    is stored under the session id when the block exits.
+    """
+    if reason is None:
+        yield None
+        return
+    profile = RunProfile(session_id, reason)
+    token = _active_profile.set(profile)
+    profiler = None
+    # Concurrent profiled runs still get call timings, just no CPU profile
+    if _cpu_profiler_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiling tool is active
+            profiler = None
+            _cpu_profiler_lock.release()
+    logger.info("Profiling run", extra=fields(reason=reason, cpu_profile=profiler is not None))
+    wall_started, cpu_started = time.perf_counter(), time.thread_time()
+    try:
+        yield profile
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _cpu_profiler_lock.release()
+        _active_profile.reset(token)
+        profile.finish(time.perf_counter() - wall_started, time.thread_time() - cpu_started, profiler)
+        try:
+            save_profile(profile)
+        except Exception as e:
+            logger.error("Could not store profile", extra=fields(error=str(e)))
+
+
+def save_profile(profile: RunProfile) -> None:
+    if _redis_client is None:
+        return
+    pipe = _redis_client.pipeline()
+    pipe.set(_key(profile.session_id), json.dumps(profile.summary, default=str), ex=PROFILE_TTL)
+    if profile.pstats is not None:
+        pipe.set(_pstats_key(profile.session_id), profile.pstats, ex=PROFILE_TTL)
+    else:
+        pipe.delete(_pstats_key(profile.session_id))
+    pipe.zadd(PROFILES_KEY, {profile.session_id: profile.started_at})
+    pipe.zremrangebyrank(PROFILES_KEY, 0, -PROFILE_INDEX_SIZE - 1)
+    pipe.execute()
+
+
+def load_profile(session_id: str) -> Optional[Dict[str, Any]]:
+    data = _redis_client.get(_key(session_id))
+    return json.loads(data) if data else None
+
+
+def load_pstats(session_id: str) -> Optional[bytes]:
+    return _redis_client.get(_pstats_key(session_id))
+
+
+def list_profiles(limit: int = 50) -> List[Dict[str, Any]]:
+    """The most recent profiles with their headline numbers (expired ones
+    are left out).
+    """
+    profiles = []
+    for session_id in _redis_client.zrevrange(PROFILES_KEY, 0, limit - 1):
+        session_id = session_id.decode() if isinstance(session_id, bytes) else session_id
+        profile = load_profile(session_id)
+        if profile is not None:
+            profiles.append({k: profile[k] for k in ("session_id", "reason", "started_at", "wall_seconds", "cpu_seconds")})
+    return profiles
@@ -0,0 +1,27 @@
+import asyncio
+import contextvars
+from typing import Any, Dict, Optional
+
+from fastapi import WebSocket
+
+# WebSocket and event loop of the run currently executing in this context.
+# Unset for headless (batch/CLI) runs, in which case updates are dropped.
+_active_websocket = contextvars.ContextVar("active_websocket", default=None)
+
+
+def bind_websocket(websocket: Optional[WebSocket], loop: asyncio.AbstractEventLoop):
+    """Binds the WebSocket (or MessageChannel wrapping it) that should
+    receive agent updates for the current context. Call from the event loop before handing the pipeline to a worker
+    thread with `asyncio.to_thread`, which copies the context across.
+    """
+    return _active_websocket.set((websocket, loop) if websocket else None)
+
+
+def send_update(message: Dict[str, Any]) -> None:
+    """Sends a message to the bound WebSocket from a pipeline worker thread.
+    """
+    bound = _active_websocket.get()
+    if bound is None:
+        return
+    websocket, loop = bound
+    asyncio.run_coroutine_threadsafe(websocket.send_json(message), loop).result()
@@ -0,0 +1,111 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.domains import domain_of
+
+# Date formats seen in search results, most specific first
+_DATE_FORMATS = ("%a, %d %b %Y %H:%M:%S %Z", "%B %d, %Y", "%b %d, %Y", "%Y-%m", "%Y")
+
+
+def parse_date(value: Any) -> Optional[str]:
+    """Parses a result's publication date into a sortable ISO date
+    (YYYY-MM-DD), or None if it is missing or unrecognized.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).date().isoformat()
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+class EvidenceRecord:
+    """One search result, keeping only the fields the pipeline uses.
+
+    `score` is the search engine's score and `relevance` the rerank score,
+    both specific to the question the result was found for; the other
+    fields describe the page. Slotted, so a session's evidence costs a
+    fixed handful of references per result instead of a dict each.
+    """
+
+    __slots__ = ("title", "url", "snippet", "source", "date", "score", "relevance")
+
+    # Page fields, shared by every question that found the page
+    PAGE_FIELDS = ("title", "url", "snippet", "source", "date")
+
+    def __init__(
+        self,
+        title: str = "",
+        url: str = "",
+        snippet: str = "",
+        source: str = "",
+        date: Optional[str] = None,
+        score: Optional[float] = None,
+        relevance: Optional[float] = None,
+    ):
+        self.title = title
+        self.url = url
+        self.snippet = snippet
+        self.source = source
+        self.date = date
+        self.score = score
+        self.relevance = relevance
+
+    @classmethod
+    def from_tavily(cls, result: Dict[str, Any]) -> "EvidenceRecord":
+        """The single conversion from a raw Tavily result."""
+        url = result.get("url") or ""
+        score = result.get("score")
+        return cls(
+            title=result.get("title") or "",
+            url=url,
+            snippet=result.get("content") or result.get("snippet") or "",
+            source=domain_of(url),
+            date=parse_date(result.get("published_date") or result.get("date")),
+            score=float(score) if score is not None else None,
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EvidenceRecord":
+        """Rebuilds a record from `to_dict` output. Raw Tavily dicts stored
+        before records were introduced are converted with `from_tavily`.
+        """
+        if "snippet" not in data:
+            record = cls.from_tavily(data)
+            record.relevance = data.get("relevance")
+            return record
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+    def to_dict(self, fields: Tuple[str, ...] = None) -> Dict[str, Any]:
+        """A compact dict of the given fields (all by default), leaving out
+        empty ones.
+        """
+        values = {name: getattr(self, name) for name in fields or self.__slots__}
+        return {name: value for name, value in values.items() if value not in (None, "")}
+
+    def replace(self, **changes: Any) -> "EvidenceRecord":
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(changes)
+        return EvidenceRecord(**values)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, EvidenceRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        # Also the cache key material for rendered evidence (see utils.evidence)
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"EvidenceRecord({fields})"
+
+
+def records_from_tavily(response: Dict[str, Any]) -> List[EvidenceRecord]:
+    """Converts a Tavily search response into evidence records."""
+    return [EvidenceRecord.from_tavily(result) for result in response.get("results", [])]
@@ -0,0 +1,111 @@
+import os
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.cluster import WEB_WORKERS
+from utils.log import fields
+
+logger = logging.getLogger(__name__)
+
+# Route socket messages through Redis pub/sub so any worker can reach a
+# session's socket ("auto" enables it when WEB_WORKERS > 1)
+WS_RELAY = os.getenv("WS_RELAY", "auto").lower()
+# Messages kept per session so a reconnecting client can catch up (?since=<seq>)
+RELAY_BACKLOG = int(os.getenv("RELAY_BACKLOG", 200))
+# Seconds a session's backlog is kept after its last message
+RELAY_BACKLOG_TTL = int(os.getenv("RELAY_BACKLOG_TTL", 15 * 60))
+
+# Async Redis client used for publishing and subscribing, set once at startup
+_redis_client = None
+
+
+def relay_enabled() -> bool:
+    return _redis_client is not None
+
+
+def configure_relay(host: str, port: int) -> None:
+    """Enables the relay when WS_RELAY (or, on "auto", the worker count)
+    asks for it.
+    """
+    global _redis_client
+    if WS_RELAY == "false" or (WS_RELAY == "auto" and WEB_WORKERS <= 1):
+        return
+    # Imported here so single-worker setups work with older redis clients
+    import redis.asyncio
+
+    _redis_client = redis.asyncio.Redis(host=host, port=port, db=0)
+    logger.info("WebSocket relay enabled", extra=fields(backlog=RELAY_BACKLOG))
+
+
+def _channel(session_id: str) -> str:
+    return f"relay:{session_id}"
+
+
+def _backlog_key(session_id: str) -> str:
+    return f"relay:{session_id}:backlog"
+
+
+def _seq_key(session_id: str) -> str:
+    return f"relay:{session_id}:seq"
+
+
+async def publish(session_id: str, message: Dict[str, Any]) -> None:
+    """Numbers a message, appends it to the session's backlog and publishes
+    it to whichever worker holds the session's socket.
+    """
+    seq = await _redis_client.incr(_seq_key(session_id))
+    envelope = json.dumps({"seq": seq, "message": message}, separators=(",", ":"))
+    pipe = _redis_client.pipeline(transaction=False)
+    pipe.rpush(_backlog_key(session_id), envelope)
+    pipe.ltrim(_backlog_key(session_id), -RELAY_BACKLOG, -1)
+    pipe.expire(_backlog_key(session_id), RELAY_BACKLOG_TTL)
+    pipe.expire(_seq_key(session_id), RELAY_BACKLOG_TTL)
+    pipe.publish(_channel(session_id), envelope)
+    await pipe.execute()
+
+
+async def subscribe(session_id: str):
+    """Subscribes to the session's messages. Await it before the socket's
+    first run starts, so nothing published in the meantime is missed.
+    """
+    pubsub = _redis_client.pubsub()
+    await pubsub.subscribe(_channel(session_id))
+    # The subscription is active once Redis confirms it
+    if await pubsub.get_message(timeout=5.0) is None:
+        logger.warning("Relay subscription not confirmed", extra=fields(session_id=session_id))
+    return pubsub
+
+
+async def forward(
+    pubsub,
+    session_id: str,
+    deliver: Callable[[Dict[str, Any]], Awaitable[None]],
+    since: Optional[int] = None,
+) -> None:
+    """Delivers the session's published messages from a `subscribe`d
+    pubsub to the local socket until cancelled. With `since`, backlog
+    messages after that sequence number are replayed first (they were
+    subscribed to before reading the backlog, so nothing published in
+    between is lost or sent twice).
+    """
+    try:
+        replayed = set()
+        if since is not None:
+            for envelope in await _redis_client.lrange(_backlog_key(session_id), 0, -1):
+                envelope = json.loads(envelope)
+                if envelope["seq"] > since:
+                    replayed.add(envelope["seq"])
+                    await deliver({**envelope["message"], "seq": envelope["seq"]})
+            if replayed:
+                logger.info("Replayed relay backlog", extra=fields(since=since, messages=len(replayed)))
+        async for item in pubsub.listen():
+            if item["type"] != "message":
+                continue
+            envelope = json.loads(item["data"])
+            if envelope["seq"] in replayed:
+                continue
+            await deliver({**envelope["message"], "seq": envelope["seq"]})
+    finally:
+        await pubsub.unsubscribe(_channel(session_id))
+        await pubsub.close()
@@ -0,0 +1,61 @@
+import os
+from typing import Dict, List
+
+import numpy as np
+
+from utils.domains import domain_trust
+from utils.retrieval import BM25Index
+from utils.records import EvidenceRecord
+
+# Results kept per question after reranking
+RERANK_TOP_K = int(os.getenv("RERANK_TOP_K", 3))
+# Weights of the question match, claim match and domain trust prior
+RERANK_QUESTION_WEIGHT = float(os.getenv("RERANK_QUESTION_WEIGHT", 0.6))
+RERANK_CLAIM_WEIGHT = float(os.getenv("RERANK_CLAIM_WEIGHT", 0.25))
+RERANK_TRUST_WEIGHT = float(os.getenv("RERANK_TRUST_WEIGHT", 0.15))
+
+
+def _normalize(scores: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Scales scores to [0, 1] by the maximum within each group."""
+    maxima = np.zeros(n_groups, dtype=np.float32)
+    np.maximum.at(maxima, groups, scores)
+    return scores / np.where(maxima[groups] > 0, maxima[groups], 1.0)
+
+
+def rerank_results(
+    research_data: Dict[str, List[EvidenceRecord]], rephrased_claim: str, top_k: int = RERANK_TOP_K
+) -> Dict[str, List[EvidenceRecord]]:
+    """Scores every result against its own question and the rephrased claim
+    with BM25 over the whole result batch, blends in the domain trust prior,
+    and keeps the `top_k` best results per question. Each kept result gets
+    its blended score in a `relevance` field.
+    """
+    questions = list(research_data)
+    results = [result for question in questions for result in research_data[question]]
+    if not results:
+        return research_data
+    groups = np.array(
+        [i for i, question in enumerate(questions) for _ in research_data[question]], dtype=np.int64
+    )
+
+    index = BM25Index([
+        {"text": f"{r.title}\n{r.snippet}"} for r in results
+    ])
+    # Column j scores all results against question j; the last column is the claim
+    scores = index.score_many(questions + [rephrased_claim])
+    question_scores = _normalize(scores[np.arange(len(results)), groups], groups, len(questions))
+    claim_scores = scores[:, -1] / (scores[:, -1].max() or 1.0)
+    trust = np.array([domain_trust(r.url) for r in results], dtype=np.float32)
+
+    relevance = (
+        RERANK_QUESTION_WEIGHT * question_scores
+        + RERANK_CLAIM_WEIGHT * claim_scores
+        + RERANK_TRUST_WEIGHT * trust
+    )
+
+    reranked = {}
+    for i, question in enumerate(questions):
+        members = np.flatnonzero(groups == i)
+        best = members[np.argsort(-relevance[members], kind="stable")][:top_k]
+        reranked[question] = [results[j].replace(relevance=round(float(relevance[j]), 4)) for j in best]
+    return reranked
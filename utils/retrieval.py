@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+# Number of chunks retrieved for each follow-up question
+FOLLOWUP_TOP_K = int(os.getenv("FOLLOWUP_TOP_K", 6))
+# Approximate chunk size (in words) for long report and analysis text
+CHUNK_WORDS = int(os.getenv("CHUNK_WORDS", 120))
+# Number of session indexes kept in memory
+MAX_SESSION_INDEXES = int(os.getenv("MAX_SESSION_INDEXES", 256))
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "did", "do", "does", "for",
+    "from", "had", "has", "have", "how", "i", "if", "in", "is", "it", "its", "of", "on",
+    "or", "that", "the", "their", "there", "these", "this", "to", "was", "were", "what",
+    "when", "where", "which", "who", "why", "will", "with", "you",
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases text and splits it into word tokens, dropping stopwords."""
+    return [t for t in _TOKEN_PATTERN.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def chunk_text(text: str, max_words: int = CHUNK_WORDS) -> List[str]:
+    """Splits text on blank lines and packs paragraphs into chunks of
+    roughly `max_words` words.
+    """
+    chunks, current, current_words = [], [], 0
+    for paragraph in re.split(r"\n\s*\n", text or ""):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        words = len(paragraph.split())
+        if current and current_words + words > max_words:
+            chunks.append("\n\n".join(current))
+            current, current_words = [], 0
+        current.append(paragraph)
+        current_words += words
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 over a small set of text chunks. Term weights are
+    precomputed into a dense NumPy matrix so a query is a single column
+    gather and row sum.
+    """
+
+    def __init__(self, chunks: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        docs = [tokenize(chunk["text"]) for chunk in chunks]
+        self.vocabulary = {}
+        for doc in docs:
+            for term in doc:
+                self.vocabulary.setdefault(term, len(self.vocabulary))
+
+        term_freqs = np.zeros((len(docs), len(self.vocabulary)), dtype=np.float32)
+        for i, doc in enumerate(docs):
+            for term in doc:
+                term_freqs[i, self.vocabulary[term]] += 1
+
+        doc_lengths = term_freqs.sum(axis=1)
+        avg_length = doc_lengths.mean() if len(docs) else 0.0
+        doc_freqs = (term_freqs > 0).sum(axis=0)
+        idf = np.log1p((len(docs) - doc_freqs + 0.5) / (doc_freqs + 0.5))
+        length_norm = k1 * (1 - b + b * doc_lengths / (avg_length or 1.0))
+        self.weights = term_freqs * (k1 + 1) / (term_freqs + length_norm[:, None]) * idf
+
+    def score(self, query: str) -> np.ndarray:
+        """Returns the BM25 score of every chunk for the query."""
+        term_ids = [self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary]
+        if not term_ids:
+            return np.zeros(len(self.chunks), dtype=np.float32)
+        return self.weights[:, term_ids].sum(axis=1)
+
+    def score_many(self, queries: List[str]) -> np.ndarray:
+        """Scores every chunk against every query in one matrix product,
+        returning a (chunks x queries) array.
+        """
+        query_terms = np.zeros((len(self.vocabulary), len(queries)), dtype=np.float32)
+        for j, query in enumerate(queries):
+            for term in set(tokenize(query)):
+                if term in self.vocabulary:
+                    query_terms[self.vocabulary[term], j] = 1.0
+        return self.weights @ query_terms
+
+    def search(self, query: str, k: int = FOLLOWUP_TOP_K) -> List[Tuple[Dict[str, Any], float]]:
+        """Returns the top-k chunks with a positive score, best first."""
+        scores = self.score(query)
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(self.chunks[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def build_session_chunks(session_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Collects the research snippets, report sections and analyses of a
+    finished session into retrievable chunks.
+    """
+    chunks = []
+    for question, results in (session_data.get("research_data") or {}).items():
+        for result in results:
+            if not result.snippet:
+                continue
+            chunks.append({
+                "kind": "Research",
+                "label": f"{result.title or 'No Title'} ({result.url or 'No URL'})",
+                "text": f"{question}\n{result.title}\n{result.snippet}",
+            })
+
+    for field, kind in [
+        ("draft_report", "Report"),
+        ("analysis", "Analysis"),
+        ("argumentation_analysis", "Argumentation"),
+        ("objectivity_feedback", "Objectivity Feedback"),
+    ]:
+        for i, text in enumerate(chunk_text(session_data.get(field))):
+            chunks.append({"kind": kind, "label": f"part {i + 1}", "text": text})
+    return chunks
+
+
+# Per-session (fingerprint, index) pairs, most recently used last
+_session_indexes = OrderedDict()
+_session_indexes_lock = threading.Lock()
+
+
+def _fingerprint(chunks: List[Dict[str, Any]]) -> str:
+    return hashlib.sha256(json.dumps(chunks, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _cache_index(session_id: str, chunks: List[Dict[str, Any]]) -> BM25Index:
+    index = BM25Index(chunks)
+    with _session_indexes_lock:
+        _session_indexes[session_id] = (_fingerprint(chunks), index)
+        _session_indexes.move_to_end(session_id)
+        while len(_session_indexes) > MAX_SESSION_INDEXES:
+            _session_indexes.popitem(last=False)
+    return index
+
+
+def index_session(session_id: str, session_data: Dict[str, Any]) -> BM25Index:
+    """Builds and caches the retrieval index for a finished session."""
+    return _cache_index(session_id, build_session_chunks(session_data))
+
+
+def get_session_index(session_id: str, session_data: Dict[str, Any]) -> BM25Index:
+    """Returns the cached index for a session, rebuilding it from the stored
+    session data if this process has not indexed it yet or indexed an older
+    run (another worker or the watchlist may have re-run the session).
+    """
+    chunks = build_session_chunks(session_data)
+    with _session_indexes_lock:
+        cached = _session_indexes.get(session_id)
+        if cached is not None and cached[0] == _fingerprint(chunks):
+            _session_indexes.move_to_end(session_id)
+            return cached[1]
+    return _cache_index(session_id, chunks)
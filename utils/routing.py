@@ -0,0 +1,96 @@
+import os
+import json
+import random
+import threading
+from typing import Any, Dict, Tuple
+
+# Routing table mapping each stage to a model, temperature and max_tokens,
+# read from MODEL_ROUTES_FILE (JSON) and/or the MODEL_ROUTES env variable:
+#
+#   {"rephrase": {"model": "gpt-4o-mini", "max_tokens": 300,
+#                 "experiment": {"name": "4o", "fraction": 0.1, "model": "gpt-4o"}}}
+#
+# Settings left out fall back to what the agent passes to chat_completion.
+MODEL_ROUTES_FILE = os.getenv("MODEL_ROUTES_FILE", "model_routes.json")
+ROUTE_SETTINGS = ("model", "temperature", "max_tokens")
+
+
+def load_routes() -> Dict[str, Dict[str, Any]]:
+    """Loads the routing table, with MODEL_ROUTES overriding the file."""
+    routes = {}
+    if os.path.exists(MODEL_ROUTES_FILE):
+        with open(MODEL_ROUTES_FILE, "r", encoding="utf-8") as f:
+            routes.update(json.load(f))
+    routes.update(json.loads(os.getenv("MODEL_ROUTES", "{}")))
+    return routes
+
+
+MODEL_ROUTES = load_routes()
+
+
+def resolve_route(
+    stage: str, model: str, temperature: float, kwargs: Dict[str, Any]
+) -> Tuple[str, str, float, Dict[str, Any]]:
+    """Applies the stage's route (and, for a sampled fraction of calls, its
+    A/B experiment) to the agent's defaults. Returns the route name along
+    with the model, temperature and extra request arguments to use.
+    """
+    route = MODEL_ROUTES.get(stage, {})
+    settings = {"model": model, "temperature": temperature, "max_tokens": kwargs.get("max_tokens")}
+    settings.update({k: route[k] for k in ROUTE_SETTINGS if k in route})
+    route_name = f"{stage}:default"
+
+    experiment = route.get("experiment")
+    if experiment and random.random() < float(experiment.get("fraction", 0)):
+        settings.update({k: experiment[k] for k in ROUTE_SETTINGS if k in experiment})
+        route_name = f"{stage}:{experiment.get('name', 'experiment')}"
+
+    kwargs = dict(kwargs)
+    if settings["max_tokens"] is not None:
+        kwargs["max_tokens"] = settings["max_tokens"]
+    return route_name, settings["model"], settings["temperature"], kwargs
+
+
+class RouteMetrics:
+    """Per-route call counts, latency and token usage for this process."""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def record(self, route_name: str, model: str, latency: float, usage: Any = None, error: bool = False) -> None:
+        with self._lock:
+            stats = self._routes.setdefault(route_name, {
+                "model": model, "calls": 0, "errors": 0, "latency_seconds": 0.0,
+                "max_latency_seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+            })
+            stats["model"] = model
+            stats["calls"] += 1
+            stats["errors"] += int(error)
+            stats["latency_seconds"] += latency
+            stats["max_latency_seconds"] = max(stats["max_latency_seconds"], latency)
+            if usage is not None:
+                stats["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                stats["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """A copy of the raw counters, for merging across workers."""
+        with self._lock:
+            return {route_name: dict(stats) for route_name, stats in self._routes.items()}
+
+    def summary(self, routes: Dict[str, Dict[str, Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """Summarizes this process's counters, or the given merged ones."""
+        routes = self.snapshot() if routes is None else routes
+        summary = {}
+        for route_name, stats in routes.items():
+            calls = stats["calls"] or 1
+            summary[route_name] = {
+                **stats,
+                "latency_seconds": round(stats["latency_seconds"], 3),
+                "avg_latency_seconds": round(stats["latency_seconds"] / calls, 3),
+                "max_latency_seconds": round(stats["max_latency_seconds"], 3),
+            }
+        return summary
+
+
+route_metrics = RouteMetrics()
@@ -0,0 +1,70 @@
+import os
+from typing import List
+
+from utils.evidence import canonical_url
+from utils.records import EvidenceRecord
+from utils.retrieval import tokenize
+
+# "adaptive" stops searching once evidence saturates; "fixed" runs every question
+RESEARCH_MODE = os.getenv("RESEARCH_MODE", "fixed")
+# Searches always run before saturation is checked
+RESEARCH_MIN_SEARCHES = int(os.getenv("RESEARCH_MIN_SEARCHES", 5))
+# Number of recent searches averaged when checking saturation
+RESEARCH_NOVELTY_WINDOW = int(os.getenv("RESEARCH_NOVELTY_WINDOW", 3))
+# Average novelty below which evidence is considered saturated
+RESEARCH_NOVELTY_THRESHOLD = float(os.getenv("RESEARCH_NOVELTY_THRESHOLD", 0.25))
+# Per-claim wall-clock and search-count budgets for research
+RESEARCH_TIME_BUDGET = float(os.getenv("RESEARCH_TIME_BUDGET", 60))
+RESEARCH_MAX_SEARCHES = int(os.getenv("RESEARCH_MAX_SEARCHES", 25))
+
+
+class EvidenceSaturation:
+    """Tracks how much new evidence each search contributes.
+
+    A result's novelty blends whether its URL and domain are new with the
+    share of its snippet's word bigrams not seen in earlier results. A
+    search's novelty is the mean over its results (0 when it returned
+    nothing new or nothing at all).
+    """
+
+    def __init__(
+        self,
+        min_searches: int = RESEARCH_MIN_SEARCHES,
+        window: int = RESEARCH_NOVELTY_WINDOW,
+        threshold: float = RESEARCH_NOVELTY_THRESHOLD,
+    ):
+        self.min_searches = min_searches
+        self.window = window
+        self.threshold = threshold
+        self.urls = set()
+        self.domains = set()
+        self.bigrams = set()
+        self.history: List[float] = []
+
+    def add(self, results: List[EvidenceRecord]) -> float:
+        """Records one search's results and returns its novelty."""
+        scores = []
+        for result in results:
+            url = canonical_url(result.url)
+            domain = result.source
+            tokens = tokenize(result.snippet)
+            bigrams = set(zip(tokens, tokens[1:]))
+            new_content = len(bigrams - self.bigrams) / len(bigrams) if bigrams else 0.0
+
+            scores.append(
+                0.4 * (url not in self.urls) + 0.2 * (domain not in self.domains) + 0.4 * new_content
+            )
+            self.urls.add(url)
+            self.domains.add(domain)
+            self.bigrams |= bigrams
+
+        novelty = sum(scores) / len(scores) if scores else 0.0
+        self.history.append(novelty)
+        return novelty
+
+    @property
+    def saturated(self) -> bool:
+        if len(self.history) < max(self.min_searches, self.window):
+            return False
+        recent = self.history[-self.window:]
+        return sum(recent) / len(recent) < self.threshold
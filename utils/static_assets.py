@@ -0,0 +1,182 @@
+import os
+import re
+import gzip
+import hashlib
+import mimetypes
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Cache-Control for fingerprinted assets, which never change under one URL
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Cache-Control for templates and unfingerprinted assets (always revalidated)
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+_STATIC_REFERENCE = re.compile(r"""(["'])/?static/([\w./-]+)\1""")
+_FINGERPRINTED_NAME = re.compile(r"^(?P<stem>.+)\.(?P<fingerprint>[0-9a-f]{10})(?P<ext>\.\w+)$")
+
+
+class CachedFile:
+    """A file's bytes with its validators and precompressed variants."""
+
+    def __init__(self, path: str, body: bytes, mtime: float, size: int):
+        self.path = path
+        self.body = body
+        self.mtime = mtime
+        self.size = size
+        self.fingerprint = hashlib.sha256(body).hexdigest()[:10]
+        self.etag = f'"{self.fingerprint}"'
+        self.last_modified = formatdate(mtime, usegmt=True)
+        self.media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        self.encodings: Dict[str, bytes] = {}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            if brotli is not None:
+                self.encodings["br"] = brotli.compress(body)
+            self.encodings["gzip"] = gzip.compress(body, compresslevel=9)
+
+
+class FileCache:
+    """In-memory file cache that reloads a file when its mtime or size
+    changes, so edited templates and assets are picked up without a restart.
+    """
+
+    def __init__(self):
+        self._files: Dict[str, CachedFile] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> CachedFile:
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._files.get(path)
+        if cached is not None and cached.mtime == stat.st_mtime and cached.size == stat.st_size:
+            return cached
+        with open(path, "rb") as f:
+            body = f.read()
+        cached = CachedFile(path, body, stat.st_mtime, stat.st_size)
+        with self._lock:
+            self._files[path] = cached
+        return cached
+
+
+def _resolve(directory: str, name: str) -> Optional[str]:
+    """Maps a relative name to a file inside `directory`, or None."""
+    base = os.path.abspath(directory)
+    path = os.path.abspath(os.path.join(base, name))
+    if not path.startswith(base + os.sep) or not os.path.isfile(path):
+        return None
+    return path
+
+
+class StaticAssets:
+    """Serves a static directory with ETag/Last-Modified validation,
+    precompressed gzip/brotli variants and content fingerprints. A file is
+    reachable both as `/static/name.ext` (revalidated on every use) and as
+    `/static/name.<fingerprint>.ext` (cached as immutable).
+    """
+
+    def __init__(self, directory: str, url_prefix: str = "/static"):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        self.files = FileCache()
+
+    def url_for(self, name: str) -> str:
+        """Returns the fingerprinted URL of a static file."""
+        path = _resolve(self.directory, name)
+        if path is None:
+            return f"{self.url_prefix}/{name}"
+        stem, ext = os.path.splitext(name)
+        return f"{self.url_prefix}/{stem}.{self.files.get(path).fingerprint}{ext}"
+
+    def response(self, request: Request, name: str) -> Response:
+        path = _resolve(self.directory, name)
+        if path is not None:
+            return cached_file_response(request, self.files.get(path), REVALIDATE_CACHE_CONTROL)
+
+        # Fingerprinted name: immutable only while the fingerprint is current
+        match = _FINGERPRINTED_NAME.match(name)
+        path = match and _resolve(self.directory, match.group("stem") + match.group("ext"))
+        if not path:
+            return Response(status_code=404)
+        cached = self.files.get(path)
+        if cached.fingerprint == match.group("fingerprint"):
+            return cached_file_response(request, cached, IMMUTABLE_CACHE_CONTROL)
+        return cached_file_response(request, cached, REVALIDATE_CACHE_CONTROL)
+
+
+class Templates:
+    """Serves HTML templates from memory with their `static/...` references
+    rewritten to fingerprinted URLs. A template is re-rendered only when it
+    or one of the assets it references changes.
+    """
+
+    def __init__(self, directory: str, assets: StaticAssets):
+        self.directory = directory
+        self.assets = assets
+        self.files = FileCache()
+        self._rendered: Dict[str, Tuple[tuple, CachedFile]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CachedFile:
+        source = self.files.get(_resolve(self.directory, name))
+        html = source.body.decode("utf-8")
+        references = sorted({m.group(2) for m in _STATIC_REFERENCE.finditer(html)})
+        urls = {ref: self.assets.url_for(ref) for ref in references}
+        key = (source.fingerprint, tuple(urls.values()))
+
+        with self._lock:
+            rendered = self._rendered.get(name)
+        if rendered is not None and rendered[0] == key:
+            return rendered[1]
+        body = _STATIC_REFERENCE.sub(lambda m: f"{m.group(1)}{urls[m.group(2)]}{m.group(1)}", html).encode("utf-8")
+        cached = CachedFile(source.path, body, source.mtime, source.size)
+        with self._lock:
+            self._rendered[name] = (key, cached)
+        return cached
+
+    def response(self, request: Request, name: str) -> Response:
+        return cached_file_response(request, self.get(name), REVALIDATE_CACHE_CONTROL)
+
+
+def _not_modified(request: Request, cached: CachedFile) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or cached.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(cached.mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def cached_file_response(request: Request, cached: CachedFile, cache_control: str) -> Response:
+    """Builds a conditional, content-negotiated response for a cached file."""
+    headers = {
+        "ETag": cached.etag,
+        "Last-Modified": cached.last_modified,
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if _not_modified(request, cached):
+        return Response(status_code=304, headers=headers)
+
+    body = cached.body
+    accepted = request.headers.get("accept-encoding", "")
+    for encoding in ("br", "gzip"):
+        if encoding in cached.encodings and encoding in accepted:
+            body = cached.encodings[encoding]
+            headers["Content-Encoding"] = encoding
+            break
+    return Response(content=body, media_type=cached.media_type, headers=headers)
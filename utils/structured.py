@@ -0,0 +1,146 @@
+import os
+import logging
+import re
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.llm import chat_completion
+from utils.log import fields
+
+logger = logging.getLogger(__name__)
+
+# Extra attempts for a stage whose reply is not valid JSON for its schema
+STRUCTURED_RETRIES = int(os.getenv("STRUCTURED_RETRIES", 2))
+# Shortest list item kept (shorter items are numbering or stray bullets)
+MIN_ITEM_LENGTH = 8
+
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]+|\d+[.)])\s*")
+RETRY_INSTRUCTION = "Your previous reply was not valid JSON matching the required schema. Reply again with only that JSON."
+
+
+def list_response_format(name: str, key: str) -> Dict[str, Any]:
+    """A strict JSON-schema response format for an object holding one list
+    of strings under `key`.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {key: {"type": "array", "items": {"type": "string"}}},
+                "required": [key],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def clean_item(text: str) -> Optional[str]:
+    """Strips list markers and markdown from an item, returning None for
+    headers, preambles and fragments.
+    """
+    text = _LIST_MARKER.sub("", text.strip()).replace("**", "").strip()
+    if len(text) < MIN_ITEM_LENGTH or text.endswith(":"):
+        return None
+    return text
+
+
+def parse_list(content: str, key: str) -> List[str]:
+    """Parses a structured reply, raising ValueError if it does not match
+    the schema.
+    """
+    try:
+        items = json.loads(content)[key]
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"Malformed structured output: {e}") from e
+    if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+        raise ValueError(f"Malformed structured output: '{key}' is not a list of strings")
+    return items
+
+
+class StructuredMetrics:
+    """Per-stage counts of structured-output calls, retries and items kept
+    or discarded by validation.
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, **counts: int) -> None:
+        with self._lock:
+            stats = self._stages.setdefault(stage, {
+                "calls": 0, "retries": 0, "malformed": 0, "items_kept": 0, "items_discarded": 0,
+            })
+            for name, count in counts.items():
+                stats[name] += count
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """A copy of the raw counters, for merging across workers."""
+        with self._lock:
+            return {stage: dict(stats) for stage, stats in self._stages.items()}
+
+    def summary(self, stages: Dict[str, Dict[str, int]] = None) -> Dict[str, Dict[str, int]]:
+        return self.snapshot() if stages is None else stages
+
+
+structured_metrics = StructuredMetrics()
+
+
+def structured_list(
+    messages: List[Dict[str, str]],
+    stage: str,
+    key: str,
+    max_items: int,
+    validate: Callable[[str], Optional[str]] = clean_item,
+    retries: int = STRUCTURED_RETRIES,
+    **kwargs,
+) -> List[str]:
+    """Requests a schema-constrained JSON list from the stage's model and
+    returns the validated, de-duplicated items (at most `max_items`).
+
+    A malformed reply is retried for this stage only, telling the model its
+    previous reply was invalid. If every attempt is malformed, the last
+    reply is split into lines as plain text. Items rejected by `validate`,
+    duplicates and items over `max_items` are counted as discarded.
+    """
+    response_format = list_response_format(stage, key)
+    # An empty list (not a retry) when the stage runs out of time
+    fallback = json.dumps({key: []})
+    attempt_messages = list(messages)
+    structured_metrics.record(stage, calls=1)
+
+    for attempt in range(retries + 1):
+        content = chat_completion(
+            messages=attempt_messages,
+            stage=stage,
+            fallback=fallback,
+            response_format=response_format,
+            **kwargs,
+        )
+        try:
+            raw_items = parse_list(content, key)
+            break
+        except ValueError as e:
+            logger.warning("Malformed structured output", extra=fields(stage=stage, attempt=attempt + 1, error=str(e)))
+            if attempt < retries:
+                structured_metrics.record(stage, retries=1)
+                attempt_messages = messages + [
+                    {"role": "assistant", "content": content},
+                    {"role": "user", "content": RETRY_INSTRUCTION},
+                ]
+    else:
+        structured_metrics.record(stage, malformed=1)
+        raw_items = content.split("\n")
+
+    items = []
+    for raw_item in raw_items:
+        item = validate(raw_item)
+        if item and item not in items:
+            items.append(item)
+    kept = items[:max_items]
+    structured_metrics.record(stage, items_kept=len(kept), items_discarded=len(raw_items) - len(kept))
+    return kept
@@ -0,0 +1,22 @@
+from functools import lru_cache
+
+import tiktoken
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    # Tokenizer matching the gpt-4o family used by the agents, loaded on first use
+    return tiktoken.encoding_for_model("gpt-4o")
+
+
+def count_tokens(text: str) -> int:
+    """Counts the tokens in text as the LLM will see them."""
+    return len(_encoding().encode(text or ""))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts text down to at most `max_tokens` tokens."""
+    tokens = _encoding().encode(text or "")
+    if len(tokens) <= max_tokens:
+        return text or ""
+    return _encoding().decode(tokens[:max_tokens])
@@ -0,0 +1,136 @@
+import os
+import json
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils.domains import DEFAULT_DOMAINS
+from utils.retrieval import tokenize
+
+# Route each search to the domains of its topic ("false" searches every default domain)
+TOPIC_ROUTING = os.getenv("TOPIC_ROUTING", "true").lower() == "true"
+# Cosine similarity a question needs with a topic to be routed to it
+TOPIC_MIN_SCORE = float(os.getenv("TOPIC_MIN_SCORE", 0.15))
+# Most topics whose domains are combined for one question
+TOPIC_MAX_TOPICS = int(os.getenv("TOPIC_MAX_TOPICS", 2))
+
+# Keywords describing each topic, stemmed the same way as questions
+TOPIC_KEYWORDS = {
+    "health": "health disease vaccine virus covid pandemic medicine drug cancer hospital patient "
+              "infection outbreak diet nutrition obesity mental clinical treatment symptom doctor",
+    "environment": "climate environment pollution emission carbon water air epa chemical waste "
+                   "warming temperature weather wildlife toxic pesticide",
+    "energy": "energy oil gas electricity nuclear solar wind power fuel renewable grid coal",
+    "science": "space nasa planet moon mars satellite rocket astronaut orbit science research asteroid",
+    "economy": "economy inflation tax budget deficit debt dollar treasury trade tariff gdp recession "
+               "price market bank business commerce export import",
+    "labor": "job employment unemployment wage worker labor union salary workforce minimum",
+    "crime": "crime police fbi arrest court justice law lawsuit prosecution prison fraud gun "
+             "terrorism investigation illegal drug trafficking",
+    "immigration": "immigration immigrant visa border citizenship asylum refugee green deportation migrant",
+    "foreign": "foreign war military army troop defense weapon intelligence cia russia china iran "
+               "ukraine israel nato diplomacy embassy sanction treaty",
+    "legislation": "congress senate bill law vote legislation house representative senator act "
+                   "amendment election policy",
+    "housing": "housing rent mortgage home homeless eviction apartment landlord",
+    "education": "school education student teacher college university loan tuition curriculum",
+    "transportation": "transportation road highway traffic car vehicle airline flight railway transit bridge",
+    "veterans": "veteran va military benefit service soldier",
+}
+
+# Domains searched for each topic, overridable with a JSON object in TOPIC_DOMAINS
+TOPIC_DOMAINS: Dict[str, List[str]] = {
+    "health": ["cdc.gov", "nih.gov", "va.gov"],
+    "environment": ["epa.gov", "nasa.gov", "energy.gov"],
+    "energy": ["energy.gov", "epa.gov", "commerce.gov"],
+    "science": ["nasa.gov", "energy.gov", "nih.gov"],
+    "economy": ["treasury.gov", "commerce.gov", "labor.gov"],
+    "labor": ["labor.gov", "commerce.gov", "treasury.gov"],
+    "crime": ["justice.gov", "fbi.gov"],
+    "immigration": ["uscis.gov", "state.gov", "justice.gov"],
+    "foreign": ["state.gov", "defense.gov", "cia.gov"],
+    "legislation": ["congress.gov", "justice.gov"],
+    "housing": ["hud.gov", "treasury.gov"],
+    "education": ["education.gov", "labor.gov"],
+    "transportation": ["transportation.gov", "energy.gov"],
+    "veterans": ["va.gov", "defense.gov"],
+}
+TOPIC_DOMAINS.update(json.loads(os.getenv("TOPIC_DOMAINS", "{}")))
+
+_SUFFIXES = ("ations", "ation", "ings", "ing", "ies", "ed")
+
+
+def stem(token: str) -> str:
+    """Crude suffix stripping so plurals and verb forms share a stem
+    (vaccine, vaccines and vaccination all become "vaccin").
+    """
+    if len(token) <= 4:
+        # Short plurals only lose their "s" (jobs, laws, cars; not gas or bus)
+        if len(token) == 4 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+            return token[:-1]
+        return token
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)] + ("y" if suffix == "ies" else "")
+            break
+    else:
+        if token.endswith("es") and token[:-2].endswith(("s", "x", "z", "ch", "sh")):
+            token = token[:-2]
+        elif token.endswith("s") and not token.endswith(("ss", "us", "is")):
+            token = token[:-1]
+    return token[:-1] if token.endswith("e") and len(token) > 4 else token
+
+
+class TopicClassifier:
+    """Nearest-centroid topic classifier over stemmed keywords. Each topic
+    centroid is its keywords weighted by inverse topic frequency and
+    normalized, so a question's scores are one matrix-vector product.
+    """
+
+    def __init__(self, topic_keywords: Dict[str, str]):
+        self.topics = list(topic_keywords)
+        keyword_sets = [{stem(t) for t in tokenize(words)} for words in topic_keywords.values()]
+        self.vocabulary = {term: i for i, term in enumerate(sorted(set().union(*keyword_sets)))}
+
+        centroids = np.zeros((len(self.topics), len(self.vocabulary)), dtype=np.float32)
+        for i, keywords in enumerate(keyword_sets):
+            for term in keywords:
+                centroids[i, self.vocabulary[term]] = 1.0
+        idf = np.log1p(len(self.topics) / centroids.sum(axis=0))
+        centroids *= idf
+        self.centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    def scores(self, text: str) -> np.ndarray:
+        """Cosine similarity of the text with every topic centroid."""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for token in tokenize(text):
+            term_id = self.vocabulary.get(stem(token))
+            if term_id is not None:
+                vector[term_id] += 1.0
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return np.zeros(len(self.topics), dtype=np.float32)
+        return self.centroids @ (vector / norm)
+
+    def classify(self, text: str, min_score: float = TOPIC_MIN_SCORE, max_topics: int = TOPIC_MAX_TOPICS) -> List[str]:
+        """Returns the best-matching topics, best first (empty if none match)."""
+        scores = self.scores(text)
+        ranked = np.argsort(-scores, kind="stable")[:max_topics]
+        return [self.topics[i] for i in ranked if scores[i] >= min_score]
+
+
+topic_classifier = TopicClassifier(TOPIC_KEYWORDS)
+
+
+def route_domains(question: str) -> Tuple[List[str], List[str]]:
+    """Picks the domains to search for a question: the union of its topics'
+    domains, or DEFAULT_DOMAINS when routing is off or no topic matches.
+    Returns the domains and the matched topics.
+    """
+    if not TOPIC_ROUTING:
+        return DEFAULT_DOMAINS, []
+    topics = topic_classifier.classify(question)
+    domains = []
+    for topic in topics:
+        domains.extend(d for d in TOPIC_DOMAINS.get(topic, []) if d not in domains)
+    return (domains, topics) if domains else (DEFAULT_DOMAINS, [])
@@ -0,0 +1,131 @@
+import os
+import json
+import zlib
+import threading
+from typing import Any, Dict, Tuple, Union
+
+from fastapi import WebSocket
+
+from utils.relay import publish, relay_enabled
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; clients then always get JSON
+    msgpack = None
+
+# Negotiate permessage-deflate with clients that offer it
+WS_PER_MESSAGE_DEFLATE = os.getenv("WS_PER_MESSAGE_DEFLATE", "true").lower() == "true"
+# Message types sent as msgpack binary frames to clients that ask for it
+BINARY_MESSAGE_TYPES = {"agent_update", "final_report", "timeline", "claim_result"}
+# Estimate deflated frame sizes; off by default, since it keeps a zlib
+# compressor (~256KB) per socket and compresses every message a second time
+WS_MEASURE_DEFLATE = os.getenv("WS_MEASURE_DEFLATE", "false").lower() == "true"
+
+
+class WireTotals:
+    """Process-wide totals of bytes sent over WebSockets."""
+
+    def __init__(self):
+        self.totals = {"claims": 0, "messages": 0, "payload_bytes": 0, "deflated_bytes": 0, "json_bytes": 0}
+        self._lock = threading.Lock()
+
+    def add(self, claim_stats: Dict[str, int]) -> None:
+        with self._lock:
+            self.totals["claims"] += 1
+            for key in ("messages", "payload_bytes", "deflated_bytes", "json_bytes"):
+                self.totals[key] += claim_stats[key]
+
+    def snapshot(self) -> Dict[str, int]:
+        """A copy of the raw counters, for merging across workers."""
+        with self._lock:
+            return dict(self.totals)
+
+    def summary(self, totals: Dict[str, int] = None) -> Dict[str, Any]:
+        summary = self.snapshot() if totals is None else dict(totals)
+        claims = summary["claims"] or 1
+        summary["avg_payload_bytes_per_claim"] = summary["payload_bytes"] // claims
+        if WS_MEASURE_DEFLATE:
+            summary["avg_deflated_bytes_per_claim"] = summary["deflated_bytes"] // claims
+        else:
+            summary.pop("deflated_bytes")
+        return summary
+
+
+wire_totals = WireTotals()
+
+
+class MessageChannel:
+    """Sends messages to one client as JSON text frames, or as msgpack
+    binary frames for BINARY_MESSAGE_TYPES when the client asked for
+    `encoding=msgpack`, and counts the bytes sent for the current claim.
+
+    With permessage-deflate the server compresses frames itself; the
+    deflated size is estimated here with a compressor that keeps its
+    context across messages, as the negotiated extension does.
+
+    With the relay enabled (see utils.relay), messages for `session_id` are
+    published through Redis instead, and the worker holding the socket
+    delivers them; so a run can finish on any worker. Bytes are then
+    counted when a message is published, on the channel of the run that
+    sent it.
+    """
+
+    def __init__(self, websocket: WebSocket, encoding: str = "json", session_id: str = None):
+        self.websocket = websocket
+        self.session_id = session_id
+        self.encoding = "msgpack" if encoding == "msgpack" and msgpack is not None else "json"
+        self._deflate = zlib.compressobj(wbits=-zlib.MAX_WBITS) if WS_MEASURE_DEFLATE else None
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats = {"messages": 0, "payload_bytes": 0, "deflated_bytes": 0, "json_bytes": 0}
+
+    def _record(self, payload: bytes, json_size: int) -> None:
+        self.stats["messages"] += 1
+        self.stats["payload_bytes"] += len(payload)
+        self.stats["json_bytes"] += json_size
+        if self._deflate is not None:
+            deflated = self._deflate.compress(payload) + self._deflate.flush(zlib.Z_SYNC_FLUSH)
+            # The extension strips the trailing empty block (4 bytes)
+            self.stats["deflated_bytes"] += len(deflated) - 4
+
+    def _encode(self, message: Dict[str, Any]) -> Tuple[Union[bytes, str], bytes, int]:
+        """The frame to send (bytes for binary, str for text), its payload
+        bytes and the size the message would have as JSON.
+        """
+        text = json.dumps(message, separators=(",", ":"))
+        if self.encoding == "msgpack" and message.get("type") in BINARY_MESSAGE_TYPES:
+            payload = msgpack.packb(message, use_bin_type=True)
+            return payload, payload, len(text.encode("utf-8"))
+        payload = text.encode("utf-8")
+        return text, payload, len(payload)
+
+    async def _send_frame(self, frame: Union[bytes, str]) -> None:
+        if isinstance(frame, bytes):
+            await self.websocket.send_bytes(frame)
+        else:
+            await self.websocket.send_text(frame)
+
+    async def send_json(self, message: Dict[str, Any]) -> None:
+        frame, payload, json_size = self._encode(message)
+        self._record(payload, json_size)
+        if self.session_id is not None and relay_enabled():
+            await publish(self.session_id, message)
+        else:
+            await self._send_frame(frame)
+
+    async def deliver(self, message: Dict[str, Any]) -> None:
+        """Sends a relayed message on this socket (counted when published)."""
+        frame, _, _ = self._encode(message)
+        await self._send_frame(frame)
+
+    def finish_claim(self) -> Dict[str, Any]:
+        """Returns the byte counts for the claim just sent, adds them to the
+        process totals and starts counting the next claim.
+        """
+        claim_stats = {"encoding": self.encoding, **self.stats}
+        if not WS_MEASURE_DEFLATE:
+            claim_stats.pop("deflated_bytes")
+        wire_totals.add(self.stats)
+        self.reset_stats()
+        return claim_stats
@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.evidence_store import evidence_ref
+from utils.records import EvidenceRecord
+from utils.log import fields
+
+logger = logging.getLogger(__name__)
+
+# Default hours between re-verifications of a watched claim
+WATCH_INTERVAL_HOURS = float(os.getenv("WATCH_INTERVAL_HOURS", 24))
+# Shortest interval a claim may be watched at (every check may re-run paid research)
+WATCH_MIN_INTERVAL_HOURS = float(os.getenv("WATCH_MIN_INTERVAL_HOURS", 1))
+# Seconds the scheduler sleeps between checks for due claims
+WATCH_POLL_SECONDS = int(os.getenv("WATCH_POLL_SECONDS", 60))
+# Lowest search score for a new result to count as material evidence
+WATCH_MIN_SCORE = float(os.getenv("WATCH_MIN_SCORE", 0.5))
+# Material new results needed before analysis and drafting are re-run
+WATCH_MIN_NEW_EVIDENCE = int(os.getenv("WATCH_MIN_NEW_EVIDENCE", 1))
+# Seconds a scheduler holds a claim before another scheduler may take it over
+WATCH_LOCK_SECONDS = int(os.getenv("WATCH_LOCK_SECONDS", 30 * 60))
+# Re-verification reports kept in each session's history
+WATCH_HISTORY = int(os.getenv("WATCH_HISTORY", 10))
+
+# Sorted set of watched session ids, scored by their next check (unix time)
+WATCHLIST_KEY = "watchlist"
+
+
+def _entry_key(session_id: str) -> str:
+    return f"watchlist:entry:{session_id}"
+
+
+def _lock_key(session_id: str) -> str:
+    return f"watchlist:lock:{session_id}"
+
+
+def watch(redis_client, session_id: str, claim: str, interval_hours: float = WATCH_INTERVAL_HOURS) -> Dict[str, Any]:
+    """Adds a verified session to the watchlist; its first re-check is due
+    one interval from now. Raises ValueError for intervals shorter than
+    WATCH_MIN_INTERVAL_HOURS.
+    """
+    if not interval_hours >= WATCH_MIN_INTERVAL_HOURS:
+        raise ValueError(f"interval_hours must be at least {WATCH_MIN_INTERVAL_HOURS}.")
+    entry = {
+        "session_id": session_id,
+        "claim": claim,
+        "interval_hours": interval_hours,
+        "added_at": time.time(),
+        "checks": 0,
+        "last_checked": None,
+        "last_report": None,
+    }
+    pipe = redis_client.pipeline()
+    pipe.set(_entry_key(session_id), json.dumps(entry))
+    pipe.zadd(WATCHLIST_KEY, {session_id: entry["added_at"] + interval_hours * 3600})
+    pipe.execute()
+    return entry
+
+
+def unwatch(redis_client, session_id: str) -> bool:
+    """Removes a session from the watchlist. Returns False if it was not watched."""
+    pipe = redis_client.pipeline()
+    pipe.zrem(WATCHLIST_KEY, session_id)
+    pipe.delete(_entry_key(session_id))
+    removed, _ = pipe.execute()
+    return bool(removed)
+
+
+def get_entry(redis_client, session_id: str) -> Optional[Dict[str, Any]]:
+    entry_json = redis_client.get(_entry_key(session_id))
+    return json.loads(entry_json) if entry_json else None
+
+
+def list_watched(redis_client) -> List[Dict[str, Any]]:
+    """Returns every watched entry with its next check time, soonest first."""
+    watched = []
+    for session_id, next_check in redis_client.zrange(WATCHLIST_KEY, 0, -1, withscores=True):
+        session_id = session_id.decode() if isinstance(session_id, bytes) else session_id
+        entry = get_entry(redis_client, session_id) or {"session_id": session_id}
+        watched.append({**entry, "next_check": next_check})
+    return watched
+
+
+def due_sessions(redis_client, now: float = None) -> List[str]:
+    """Session ids whose next check is at or before `now`."""
+    due = redis_client.zrangebyscore(WATCHLIST_KEY, "-inf", now or time.time())
+    return [s.decode() if isinstance(s, bytes) else s for s in due]
+
+
+def new_evidence(
+    old_results: List[EvidenceRecord], new_results: List[EvidenceRecord], min_score: float = WATCH_MIN_SCORE
+) -> List[EvidenceRecord]:
+    """Diffs a fresh search against the stored evidence for a question.
+    Returns the results whose page or content was not seen before and whose
+    search score is at least `min_score` (unscored results always count).
+    """
+    seen = {evidence_ref(result) for result in old_results}
+    return [
+        result for result in new_results
+        if evidence_ref(result) not in seen and (result.score is None or result.score >= min_score)
+    ]
+
+
+def run_due(redis_client, reverify: Callable[[str], Optional[Dict[str, Any]]], now: float = None) -> List[Dict[str, Any]]:
+    """Re-verifies every due session with `reverify` and schedules its next
+    check. A short Redis lock per session keeps concurrent schedulers from
+    checking the same claim. Sessions that no longer exist are unwatched.
+    """
+    reports = []
+    for session_id in due_sessions(redis_client, now):
+        if not redis_client.set(_lock_key(session_id), "1", nx=True, ex=WATCH_LOCK_SECONDS):
+            continue
+        try:
+            entry = get_entry(redis_client, session_id)
+            if entry is None:
+                redis_client.zrem(WATCHLIST_KEY, session_id)
+                continue
+            try:
+                report = reverify(session_id)
+            except Exception as e:
+                logger.error("Re-verification failed", extra=fields(session_id=session_id, error=str(e)))
+                report = {"status": "error", "error": str(e)}
+            if report is None:
+                logger.warning("Watched session no longer exists", extra=fields(session_id=session_id))
+                unwatch(redis_client, session_id)
+                continue
+
+            entry["checks"] += 1
+            entry["last_checked"] = time.time()
+            entry["last_report"] = report
+            pipe = redis_client.pipeline()
+            pipe.set(_entry_key(session_id), json.dumps(entry))
+            pipe.zadd(WATCHLIST_KEY, {session_id: entry["last_checked"] + entry["interval_hours"] * 3600})
+            pipe.execute()
+            reports.append({"session_id": session_id, **report})
+        finally:
+            redis_client.delete(_lock_key(session_id))
+    return reports
+
+
+def run_scheduler(
+    redis_client,
+    reverify: Callable[[str], Optional[Dict[str, Any]]],
+    poll_seconds: int = WATCH_POLL_SECONDS,
+    once: bool = False,
+) -> None:
+    """Checks the watchlist every `poll_seconds` and re-verifies due claims."""
+    while True:
+        for report in run_due(redis_client, reverify):
+            logger.info("Re-verified watched claim", extra=fields(**report))
+        if once:
+            return
+        time.sleep(poll_seconds)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Manage and re-verify watched claims.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="Watch a verified session")
+    add.add_argument("session_id")
+    add.add_argument("--interval-hours", type=float, default=WATCH_INTERVAL_HOURS)
+    remove = commands.add_parser("remove", help="Stop watching a session")
+    remove.add_argument("session_id")
+    commands.add_parser("list", help="List watched sessions")
+    run = commands.add_parser("run", help="Run the re-verification scheduler")
+    run.add_argument("--once", action="store_true", help="Check due claims once and exit")
+    run.add_argument("--poll-seconds", type=int, default=WATCH_POLL_SECONDS)
+    args = parser.parse_args(argv)
+
+    # Imported lazily so the module can be used by main.py without a cycle
+    from main import redis_client, get_session_data, reverify_session
+
+    if args.command == "add":
+        session_data = get_session_data(args.session_id)
+        if session_data is None:
+            print(f"No session {args.session_id}.", file=sys.stderr)
+            return 1
+        try:
+            entry = watch(redis_client, args.session_id, session_data["claim"], args.interval_hours)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+        print(json.dumps(entry, indent=2))
+    elif args.command == "remove":
+        if not unwatch(redis_client, args.session_id):
+            print(f"Session {args.session_id} is not watched.", file=sys.stderr)
+            return 1
+    elif args.command == "list":
+        for entry in list_watched(redis_client):
+            print(json.dumps(entry))
+    else:
+        run_scheduler(redis_client, reverify_session, args.poll_seconds, args.once)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())